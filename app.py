@@ -1,6 +1,9 @@
-from ipl_helper.cricbuzz_scraper import get_ipl_schedule, get_points_table, matches_played
+from ipl_helper.cricbuzz_scraper import fetch_season
+from ipl_helper.snapshot import replay_path
+from ipl_helper.result_cache import ResultCache, result_key
+from ipl_helper.precompute import ResultStore, DEFAULT_SEED
 import streamlit as st
-from ipl_helper import MyTeam, AllTeams
+from ipl_helper import MyTeamRare, SimulateSeason, SimulateSamples, MostLikelyScenarios
 import concurrent.futures
 import pandas as pd
 import altair as alt
@@ -13,6 +16,39 @@ import os
 
 teams = ["RCB", "DC", "GT", "MI", "PBSK", "RR", "CSK", "SRH", "KKR", "LSG"]
 
+# Fixed seed, so every session asking the same question gets the same (cached) answer;
+# shared with the precompute worker so its published results match these keys
+SIMULATION_SEED = DEFAULT_SEED
+
+
+@st.cache_resource
+def shared_result_cache():
+    """One result cache for every session of this server process"""
+    return ResultCache()
+
+
+@st.cache_resource
+def published_results():
+    """Results published by the background precompute worker (python -m ipl_helper.precompute)"""
+    return ResultStore()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_season():
+    return fetch_season()
+
+
+# Stored samples behind the what-if toggle (outcomes + per-match probabilities + positions);
+# only built once a session turns what-if on, since the page's own results need no samples
+WHAT_IF_SAMPLES = 200_000
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def what_if_samples(season):
+    """Sample set for what-if questions on this season state, shared by every session"""
+    return SimulateSamples(season, simulations=WHAT_IF_SAMPLES, seed=SIMULATION_SEED)
+
+
 # Team backgrounds, slogans and colors
 team_backgrounds = {
     "CSK": "linear-gradient(135deg, #FFFF00 0%, #FDB913 100%)",
@@ -111,6 +147,11 @@ def main():
         More simulation runs = better accuracy but longer calculation time.
         """)
     
+    # One download of the season state for this run
+    season = load_season()
+    if replay_path() is not None:
+        st.caption(f"Replaying saved season snapshot {os.path.basename(replay_path())} (offline)")
+    
     col1, col2 = st.columns([2, 1])
     
     with col1:
@@ -119,7 +160,7 @@ def main():
         
     with col2:
         # Match simulation counter
-        matches_done = matches_played()
+        matches_done = season.matches_done
         simulations = 0
         if matches_done < 50:
             # Restore slider but with better optimization options
@@ -180,7 +221,7 @@ def main():
             """)
         
         # Start processing team data
-        process_team_data(selected_tag, simulations, quick_partial_results)
+        process_team_data(selected_tag, simulations, quick_partial_results, season)
     
     # Footer
     footer_note = get_footer_note()
@@ -273,17 +314,14 @@ def team_selector():
     return selected_team
 
 
-def process_team_data(selected_tag, simulations, quick_partial_results):
+def process_team_data(selected_tag, simulations, quick_partial_results, season):
     """Process team data with progressive loading and visualization"""
     # Status container for live updates
     status_container = st.empty()
     with status_container.container():
         st.info(f"Fetching latest data for {selected_tag}...")
     
-    # Fetch data
-    matches_done = matches_played()
-    T = get_points_table()
-    S = get_ipl_schedule()[matches_done:]
+    # Season data fetched once in main(); the SeasonState goes to the engine and caches as is
     
     # Create placeholders for metrics and results
     metric_placeholders = [st.empty(), st.empty(), st.empty()]
@@ -294,9 +332,40 @@ def process_team_data(selected_tag, simulations, quick_partial_results):
     with status_container.container():
         st.info(f"Running playoff qualification simulations for {selected_tag}...")
     
+    def report_chunk(stats):
+        with status_container.container():
+            st.info(f"Simulated {stats['samples_done']:,} of {stats['samples_total']:,} runs "
+                    f"(chunk {stats['chunk'] + 1}: {stats['seconds']:.1f}s, {stats['bytes'] / 2**20:.0f} MB)")
+    
+    # Answers already computed for this season state (by any session) are reused
+    cache = shared_result_cache()
+    keys = {fp: result_key(season, None, selected_tag, fp, simulations, SIMULATION_SEED) for fp in (4, 2, 1)}
+    results = {fp: cache.get(key) for fp, key in keys.items()}
+    for fp, key in keys.items():
+        if results[fp] is None:
+            results[fp] = published_results().get(season, None, key)
+            if results[fp] is not None:
+                cache.put(key, results[fp])
+    
+    if results[4] is None or results[2] is None:
+        # One simulation pass gives every team's finishing-position distribution
+        outlook = SimulateSeason(season, simulations=simulations, progress=report_chunk,
+                                 workers=os.cpu_count() or 1, seed=SIMULATION_SEED)
+        cache.put_outlook(outlook, season, None, simulations, SIMULATION_SEED, positions=(2, 4))
+        for team in outlook.teams:
+            top_1 = outlook.probability(team, 1)
+            # Rare top-1 estimates are refined below before they are cached
+            if outlook.exact or top_1 >= 1.0:
+                cache.put(result_key(season, None, team, 1, simulations, SIMULATION_SEED),
+                          (top_1,) + outlook.example(team, 1))
+        results = {fp: cache.get(key) for fp, key in keys.items()}
+    
     # Calculate top 4 chances (playoff qualification)
-    future_top4 = MyTeam(selected_tag, T, matches_done, S, 4, simulations)
-    top_4, pred_match_outcomes, pred_points_table = future_top4
+    top_4, pred_match_outcomes, pred_points_table = results[4]
+    # Show the most probable qualifying results rather than the first simulated one
+    scenarios = MostLikelyScenarios(selected_tag, season)
+    if scenarios:
+        _, pred_match_outcomes, pred_points_table = scenarios[0]
     
     # Display top 4 results immediately
     col1, col2, col3 = st.columns(3)
@@ -316,6 +385,7 @@ def process_team_data(selected_tag, simulations, quick_partial_results):
             with tab1:
                 if pred_match_outcomes:
                     create_prediction_table(pred_match_outcomes)
+                    create_what_if(season, selected_tag, "partial")
                 else:
                     st.info("Calculating match predictions...")
             
@@ -339,8 +409,7 @@ def process_team_data(selected_tag, simulations, quick_partial_results):
                     st.info("Preparing visualizations...")
     
     # Calculate top 2 chances
-    future_top2 = MyTeam(selected_tag, T, matches_done, S, 2, simulations)
-    top_2, pred_match_outcomes_2, pred_points_table_2 = future_top2
+    top_2 = results[2][0]
     
     # Display top 2 results when available
     with col2:
@@ -349,8 +418,13 @@ def process_team_data(selected_tag, simulations, quick_partial_results):
     
     # Calculate championship chances (with explanation)
     # Using 75% of top 1 finish to represent championship probability
-    future_top1 = MyTeam(selected_tag, T, matches_done, S, 1, simulations)
-    top_1, pred_match_outcomes_1, pred_points_table_1 = future_top1
+    if results[1] is None:
+        # Too few plain samples hit a rare top-1 finish; re-estimate with importance sampling
+        top_1, _, out, tab = MyTeamRare(selected_tag, season, for_position=1, simulations=simulations,
+                                        workers=os.cpu_count() or 1, seed=SIMULATION_SEED)
+        cache.put(keys[1], (top_1, out, tab))
+    else:
+        top_1 = results[1][0]
     championship_prob = top_1 * 0.75  # Discount for playoff uncertainty
     
     # Display championship results
@@ -371,6 +445,7 @@ def process_team_data(selected_tag, simulations, quick_partial_results):
         
         with tab1:
             create_prediction_table(pred_match_outcomes)
+            create_what_if(season, selected_tag, "final")
         
         with tab2:
             create_points_table(pred_points_table, selected_tag)
@@ -436,7 +511,7 @@ def create_prediction_table(pred_match_outcomes):
         
         1. Each match is simulated based on team strength (points, NRR, form)
         2. Head-to-head record adjustments are applied
-        3. The most likely outcome across all simulations is shown
+        3. The single most probable set of results in which the team qualifies is shown (found by a beam search over the remaining matches)
         4. Win probability indicates confidence in the prediction
         
         Note that cricket is inherently unpredictable - even a team with 80% 
@@ -444,6 +519,34 @@ def create_prediction_table(pred_match_outcomes):
         """)
 
 
+def create_what_if(season, selected_team, view_mode="default"):
+    """Pin some remaining results and see the playoff chances move"""
+    S = season.remaining_schedule()
+    # Widget keys per view mode: the partial and final tabs can render in the same run
+    if not S or not st.checkbox("🔮 What-if mode: pick winners for upcoming matches",
+                                key=f"what_if_{view_mode}"):
+        return
+    
+    with st.spinner("Preparing what-if samples (once per data update)..."):
+        samples = what_if_samples(season)
+    
+    labels = {f"Match {season.matches_done + i + 1}: {a} vs {b}": i for i, (a, b) in enumerate(S)}
+    picked = st.multiselect("Matches to fix", list(labels), key=f"what_if_matches_{view_mode}")
+    pinned = {}
+    for label in picked:
+        m_idx = labels[label]
+        pinned[m_idx] = st.radio(label, S[m_idx], horizontal=True, key=f"what_if_{view_mode}_{m_idx}")
+    
+    base = samples.what_if(selected_team, 4)[0]
+    prob, effective, reused = samples.what_if(selected_team, 4, pinned)
+    st.metric(f"{selected_team} Playoff Chances (what-if)", f"{prob:.1f}%", f"{prob - base:+.1f}%")
+    if pinned:
+        how = "reweighted stored samples" if reused else "a quick re-simulation of the other matches"
+        st.caption(f"From {how} ({effective:,} effective samples)")
+    
+    create_leverage_table(season, samples, selected_team)
+
+
 def create_points_table(pred_points_table, selected_team):
     """Enhanced points table with highlighting and visual indicators"""
     if not pred_points_table:
@@ -1161,6 +1264,26 @@ def create_qualification_path(pred_match_outcomes, selected_team):
         
         Remember that while this shows the most probable path, cricket is unpredictable and there might be multiple paths to qualification!
         """)
+
+
+def create_leverage_table(season, samples, selected_team, top=8):
+    """Rank remaining matches by how much their result moves the selected team's playoff chances"""
+    with st.spinner("Ranking the remaining matches..."):
+        table = samples.leverage(selected_team, 4)
+    
+    st.markdown("#### 🎯 Matches That Matter Most")
+    rows = []
+    for m_idx, (team_a, team_b), p_if_a, p_if_b, swing in sorted(table, key=lambda row: -abs(row[4]))[:top]:
+        cheer, good, bad = (team_a, p_if_a, p_if_b) if swing >= 0 else (team_b, p_if_b, p_if_a)
+        rows.append({
+            "Match": f"{season.matches_done + m_idx + 1}: {team_a} vs {team_b}",
+            "Cheer For": cheer,
+            "If They Win": f"{good:.1f}%",
+            "If They Lose": f"{bad:.1f}%",
+            "Swing": f"{abs(swing):.1f} pts",
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    st.caption(f"{selected_team}'s playoff chances with each match's result fixed, from one set of simulations")
     
 
 if __name__ == "__main__":
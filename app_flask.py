@@ -1,7 +1,92 @@
-from flask import Flask, render_template, request
+import os
+import argparse
+from flask import Flask, render_template, request, jsonify, url_for
 from ipl_helper import MyTeam, AllTeams
+from ipl_helper import snapshot
+from ipl_helper.cricbuzz_scraper import fetch_season
+from ipl_helper.result_cache import result_key
+from ipl_helper.precompute import ResultStore, DEFAULT_SIMULATIONS, DEFAULT_SEED
+from ipl_helper.jobs import JobQueue, JOB_WORKERS, FAILED
+
+# Largest sample count the API accepts for one job
+MAX_API_SAMPLES = 5_000_000
+# Processes per job: jobs run side by side, so each gets its share of the cores
+JOB_SIMULATION_WORKERS = max(1, (os.cpu_count() or 1) // JOB_WORKERS)
+# Seconds a page request waits for its job before answering with a page that polls for it
+PAGE_WAIT_SECONDS = 2
 
 app = Flask(__name__)
+# Results published by the background precompute worker (python -m ipl_helper.precompute)
+store = ResultStore()
+# Simulations requested through the JSON API, run outside the request
+jobs = JobQueue()
+
+
+def published(season, team, for_position, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED):
+    """Precomputed (probability, example_out, example_tab) for the current season, or None"""
+    return store.get(season, None, result_key(season, None, team, for_position, simulations, seed))
+
+
+def simulate(season, team, for_position, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED,
+             workers=JOB_SIMULATION_WORKERS):
+    """(probability, example_out, example_tab): from the store if published, else simulated"""
+    result = published(season, team, for_position, simulations, seed)
+    if result is None:
+        result = MyTeam(team, season, for_position=for_position, simulations=simulations,
+                        workers=workers, seed=seed)
+    return result
+
+
+def simulation_job(season, team, for_position, simulations, seed):
+    probability, example_out, example_tab = simulate(season, team, for_position, simulations, seed)
+    example = None
+    # No example when no sample qualified, or ([], []) when nothing is left to play
+    if isinstance(example_tab, dict):
+        example = {
+            'matches': [{'teams': list(teams), 'winner': winner} for teams, winner in example_out],
+            'table': [{'team': t, 'points': pts, 'nrr': nrr} for t, (pts, nrr) in example_tab.items()],
+        }
+    return {
+        'team': team,
+        'threshold': for_position,
+        'samples': simulations,
+        'seed': seed,
+        'matches_done': season.matches_done,
+        'probability': probability,
+        'example': example,
+    }
+
+
+def all_teams_job(season):
+    return AllTeams(DEFAULT_SIMULATIONS, workers=JOB_SIMULATION_WORKERS, seed=DEFAULT_SEED, season=season)
+
+
+def run_job(job_id, func, *args):
+    """Queue func as job_id (or join the identical job); its result if done within PAGE_WAIT_SECONDS, else None"""
+    status = jobs.wait(jobs.submit(job_id, func, *args)['job_id'], PAGE_WAIT_SECONDS)
+    if status['status'] == FAILED:
+        raise RuntimeError(status['error'])
+    return status.get('result')
+
+
+def pending_page(job_id, action, **fields):
+    """Page that polls job_id and re-posts the form to action once it has finished"""
+    return render_template('index.html', pending_poll=url_for('api_job', job_id=job_id),
+                           pending_action=action, pending_fields=fields), 202
+
+
+def _int_field(params, name, default, low, high):
+    value = params.get(name, default)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}")
+    return value
+
 
 @app.route('/', methods=['GET', 'POST'])
 def home():
@@ -10,16 +95,71 @@ def home():
 @app.route('/myteam', methods=['POST'])
 def myteam():
     team_name = request.form['team_name']
-    myteam_probability, op0, ot0 = MyTeam(team_name)
+    season = fetch_season()
+    # Through the job queue, so page requests share cores (and identical jobs) with the API
+    job_id = result_key(season, None, team_name, 4, DEFAULT_SIMULATIONS, DEFAULT_SEED)
+    result = run_job(job_id, simulation_job, season, team_name, 4, DEFAULT_SIMULATIONS, DEFAULT_SEED)
+    if result is None:
+        return pending_page(job_id, url_for('myteam'), team_name=team_name)
+    myteam_probability = result['probability']
+    op0 = ot0 = None
+    if result['example'] is not None:
+        op0 = [(tuple(match['teams']), match['winner']) for match in result['example']['matches']]
+        ot0 = {row['team']: (row['points'], row['nrr']) for row in result['example']['table']}
     return render_template('index.html', myteam_probability=myteam_probability, team_name=team_name, op0=op0, ot0=ot0)
 
 
 @app.route('/allteams', methods=['POST'])
 def allteams():
-    probabilities = AllTeams()
+    season = fetch_season()
+    results = {team: published(season, team, 4) for team in season.teams}
+    if all(result is not None for result in results.values()):
+        probabilities = {team: result[0] for team, result in results.items()}
+    else:
+        # team None: one job answers every team
+        job_id = result_key(season, None, None, 4, DEFAULT_SIMULATIONS, DEFAULT_SEED)
+        probabilities = run_job(job_id, all_teams_job, season)
+        if probabilities is None:
+            return pending_page(job_id, url_for('allteams'))
     return render_template('index.html', allteams_probabilities=probabilities)
 
-if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
 
+@app.route('/api/simulations', methods=['POST'])
+def api_submit():
+    """Start (or join) a simulation; answers 202 with a job id to poll"""
+    params = request.get_json(silent=True) or request.form
+    season = fetch_season()
+    teams = list(season.teams)
+    team = params.get('team')
+    if team not in teams:
+        return jsonify(error=f"'team' must be one of {', '.join(teams)}"), 400
+    try:
+        for_position = _int_field(params, 'threshold', 4, 1, len(teams))
+        simulations = _int_field(params, 'samples', DEFAULT_SIMULATIONS, 1, MAX_API_SAMPLES)
+        seed = _int_field(params, 'seed', DEFAULT_SEED, 0, 2 ** 63 - 1)
+    except ValueError as error:
+        return jsonify(error=str(error)), 400
 
+    # Identical questions about the same season state share one job
+    job_id = result_key(season, None, team, for_position, simulations, seed)
+    status = jobs.submit(job_id, simulation_job, season, team, for_position, simulations, seed)
+    status['poll'] = url_for('api_job', job_id=job_id)
+    return jsonify(status), 200 if status['status'] == 'done' else 202
+
+
+@app.route('/api/simulations/<job_id>', methods=['GET'])
+def api_job(job_id):
+    status = jobs.status(job_id)
+    if status is None:
+        return jsonify(error='unknown job id'), 404
+    return jsonify(status)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replay', metavar='SNAPSHOT',
+                        help='serve a saved season snapshot instead of live Cricbuzz data')
+    args = parser.parse_args()
+    if args.replay:
+        snapshot.replay(args.replay)
+    app.run(debug=True, host='0.0.0.0', port=5001)
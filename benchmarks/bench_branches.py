@@ -0,0 +1,46 @@
+# RCBinator
+# Benchmark: exact enumeration vs Monte Carlo on small schedules
+#
+# Timing only; tests/test_branches.py checks that the two branches agree.
+#
+#   python -m benchmarks.bench_branches [samples]
+
+import sys
+import time
+import random
+import numpy as np
+
+from ipl_helper import SimulateSeason
+
+TEAMS = ["CSK", "DC", "GT", "MI", "PBSK", "RR", "RCB", "SRH", "KKR", "LSG"]
+
+
+def make_season(num_matches, seed=0):
+    rng = random.Random(seed)
+    T = {t: [rng.randrange(0, 16, 2), round(rng.uniform(-1, 1), 3)] for t in TEAMS}
+    S = [rng.sample(TEAMS, 2) for _ in range(num_matches)]
+    return T, S
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for num_matches in (6, 10, 14):
+        T, S = make_season(num_matches, seed=num_matches)
+
+        start = time.perf_counter()
+        exact = SimulateSeason(T, 0, S, exact=True, seed=1)
+        exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sampled = SimulateSeason(T, 0, S, samples, exact=False, seed=1)
+        mc_time = time.perf_counter() - start
+
+        p = np.clip(exact.matrix, 0, 1)
+        worst = np.abs(sampled.matrix - p).max()
+
+        print(f"matches={num_matches:2d} exact={exact_time:6.3f}s "
+              f"monte_carlo={mc_time:6.3f}s ({samples:,} samples) max |diff|={worst:.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# RCBinator
+# Benchmark: Cricbuzz page cache against the local stand-in server
+#
+#   python -m benchmarks.bench_cache [latency_seconds]
+
+import sys
+import time
+import tempfile
+
+from ipl_helper.cricbuzz_scraper import CricbuzzClient, pooled_session
+from ipl_helper.http_cache import ResponseCache
+from benchmarks.cricbuzz_standin import StandInServer
+
+
+def timed_fetch(label, client):
+    start = time.perf_counter()
+    season = client.fetch_season()
+    print(f"{label:<34} {time.perf_counter() - start:7.3f}s  {client.cache.stats()}")
+    return season
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    server = StandInServer(latency=latency).start()
+
+    with tempfile.TemporaryDirectory() as directory:
+        def new_client(ttl, stale_while_revalidate=True):
+            session = pooled_session()
+            cache = ResponseCache(session=session, directory=directory, ttl=ttl,
+                                  stale_while_revalidate=stale_while_revalidate)
+            return CricbuzzClient(session=session, cache=cache, base_url=server.url)
+
+        cold = timed_fetch("cold (empty cache)", new_client(ttl=60))
+        warm = timed_fetch("warm (new client, same disk)", new_client(ttl=60))
+        assert warm == cold
+
+        client = new_client(ttl=0)
+        timed_fetch("expired, stale-while-revalidate", client)
+        client.cache.wait()
+        timed_fetch("expired, revalidate inline", new_client(ttl=0, stale_while_revalidate=False))
+
+    print(f"server saw {len(server.requests)} requests, {server.not_modified} answered 304")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+# RCBinator
+# Benchmark: sequential vs concurrent page fetches against the local stand-in
+#
+#   python -m benchmarks.bench_fetch [latency_seconds]
+
+import sys
+import time
+import asyncio
+
+from ipl_helper.cricbuzz_scraper import CricbuzzClient, fetch_season_async
+from benchmarks.cricbuzz_standin import StandInServer
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    server = StandInServer(latency=latency).start()
+
+    start = time.perf_counter()
+    sequential = CricbuzzClient(base_url=server.url).fetch_season()
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = asyncio.run(fetch_season_async(CricbuzzClient(base_url=server.url)))
+    concurrent_time = time.perf_counter() - start
+
+    assert sequential == concurrent
+    print(f"per-page latency {latency:.2f}s")
+    print(f"sequential: {sequential_time:6.3f}s")
+    print(f"concurrent: {concurrent_time:6.3f}s")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# RCBinator
+# Benchmark: recent-form tracking in the Monte Carlo branch
+#
+#   python -m benchmarks.bench_form [samples]
+
+import sys
+import time
+import random
+import numpy as np
+
+from ipl_helper.ipl_helper import FormTracker, RecentFormBuffer, RECENT_MATCHES_WINDOW
+
+TEAMS = ["CSK", "DC", "GT", "MI", "PBSK", "RR", "RCB", "SRH", "KKR", "LSG"]
+
+
+def make_schedule(num_matches, seed=0):
+    rng = random.Random(seed)
+    return [tuple(rng.sample(range(len(TEAMS)), 2)) for _ in range(num_matches)]
+
+
+def legacy_form(matches, outcomes):
+    """The per-sample Python loop the Monte Carlo branch used to run"""
+    samples, num_teams = outcomes.shape[0], len(TEAMS)
+    team_forms = np.full((samples, num_teams), 0.5, dtype=np.float32)
+    match_winners = np.zeros(outcomes.shape, dtype=np.int32)
+    for m_idx, (a, b) in enumerate(matches):
+        a_wins = outcomes[:, m_idx].astype(bool)
+        match_winners[a_wins, m_idx] = a
+        match_winners[~a_wins, m_idx] = b
+        if m_idx >= RECENT_MATCHES_WINDOW:
+            for sim in range(samples):
+                for t_idx in range(num_teams):
+                    wins = played = 0
+                    for prev in range(m_idx - RECENT_MATCHES_WINDOW, m_idx):
+                        if t_idx in matches[prev]:
+                            played += 1
+                            wins += match_winners[sim, prev] == t_idx
+                    if played:
+                        team_forms[sim, t_idx] = max(0.1, min(1.0, 0.1 + 0.9 * wins / played))
+    return team_forms
+
+
+def buffer_form(matches, outcomes):
+    form = RecentFormBuffer(outcomes.shape[0], len(TEAMS))
+    for m_idx, (a, b) in enumerate(matches):
+        form.record(a, b, outcomes[:, m_idx].astype(bool))
+    return form.forms
+
+
+def check_semantics(matches, outcomes, checks=20):
+    """Ring buffer must agree with FormTracker.update_team_form"""
+    forms = buffer_form(matches, outcomes)
+    for sim in range(min(checks, outcomes.shape[0])):
+        tracker = FormTracker(TEAMS)
+        for m_idx, (a, b) in enumerate(matches):
+            winner, loser = (a, b) if outcomes[sim, m_idx] else (b, a)
+            tracker.update_team_form(TEAMS[winner], TEAMS[loser])
+        expected = np.array([tracker.team_form[t] for t in TEAMS], dtype=np.float32)
+        assert np.allclose(forms[sim], expected), (sim, forms[sim], expected)
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    matches = make_schedule(40)
+    outcomes = np.random.default_rng(0).integers(0, 2, size=(samples, len(matches)))
+
+    check_semantics(matches, outcomes)
+
+    start = time.perf_counter()
+    legacy_form(matches, outcomes)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer_form(matches, outcomes)
+    vectorized = time.perf_counter() - start
+
+    print(f"samples={samples} matches={len(matches)}")
+    print(f"legacy loop:  {legacy:8.3f}s")
+    print(f"ring buffer:  {vectorized:8.3f}s  ({legacy / vectorized:,.0f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# RCBinator
+# Benchmark: Monte Carlo match-loop backends (numpy, numba kernel, uncompiled kernel)
+#
+#   python -m benchmarks.bench_kernels [samples]
+#
+# Timing only; tests/test_kernels.py checks that every backend gives the NumPy loop's samples.
+
+import os
+import sys
+import time
+
+from ipl_helper import Engine, SimulateSeason
+from ipl_helper.kernels import HAVE_NUMBA
+from ipl_helper.snapshot import load_snapshot
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+SEED = 11
+# The uncompiled kernel is slow; it is timed on fewer samples
+PYTHON_SAMPLES = 3_000
+
+
+def throughput(engine, season, samples):
+    SimulateSeason(season, simulations=min(samples, 1_000), seed=SEED, engine=engine)  # JIT warm-up
+    start = time.perf_counter()
+    SimulateSeason(season, simulations=samples, seed=SEED, engine=engine)
+    return samples / (time.perf_counter() - start)
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    season = load_snapshot(FIXTURE_SNAPSHOT)
+    print(f"{len(season.remaining_schedule())} matches left; numba {'installed' if HAVE_NUMBA else 'not installed'}")
+
+    for backend in ('numpy', 'numba', 'python'):
+        if backend == 'numba' and not HAVE_NUMBA:
+            print(f"{backend:>7}: skipped")
+            continue
+        n = PYTHON_SAMPLES if backend == 'python' else samples
+        print(f"{backend:>7}: {throughput(Engine(backend=backend), season, n):>12,.0f} samples/s ({n:,} samples)")
+
+
+if __name__ == '__main__':
+    main()
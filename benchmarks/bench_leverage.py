@@ -0,0 +1,46 @@
+# RCBinator
+# Benchmark: the per-match leverage table in one pass vs one what-if per match and result
+#
+#   python -m benchmarks.bench_leverage [simulations]
+
+import os
+import sys
+import time
+import numpy as np
+
+from ipl_helper import SimulateSamples
+from ipl_helper.snapshot import load_snapshot
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+SEED = 7
+TEAM = 'RCB'
+
+
+def main():
+    simulations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    season = load_snapshot(FIXTURE_SNAPSHOT)
+    S = season.remaining_schedule()
+    samples = SimulateSamples(season.points_table(), season.matches_done, S, simulations, seed=SEED)
+
+    start = time.perf_counter()
+    table = samples.leverage(TEAM, 4)
+    one_pass = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for m_idx, (team_a, team_b), p_if_a, p_if_b, _ in table:
+        pinned_a = samples.what_if(TEAM, 4, {m_idx: team_a}, min_samples=0)[0]
+        pinned_b = samples.what_if(TEAM, 4, {m_idx: team_b}, min_samples=0)[0]
+        assert np.isclose(p_if_a, pinned_a, atol=1e-3) and np.isclose(p_if_b, pinned_b, atol=1e-3)
+    per_match = time.perf_counter() - start
+
+    print(f"{len(S)} matches left, {simulations:,} samples")
+    print(f"leverage table (one pass): {one_pass * 1000:7.1f} ms")
+    print(f"2 x {len(S)} single what-ifs:   {per_match * 1000:7.1f} ms")
+    print(f"most important matches for {TEAM}:")
+    for m_idx, (team_a, team_b), p_if_a, p_if_b, swing in sorted(table, key=lambda row: -abs(row[4]))[:5]:
+        print(f"  {team_a} vs {team_b}: {p_if_a:5.1f}% if {team_a} win, "
+              f"{p_if_b:5.1f}% if {team_b} win (swing {swing:+.1f})")
+
+
+if __name__ == '__main__':
+    main()
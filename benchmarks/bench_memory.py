@@ -0,0 +1,119 @@
+# RCBinator
+# Benchmark: peak RSS of the Monte Carlo engine, and of outcome layouts (int64, bool, bit-packed)
+#
+#   python -m benchmarks.bench_memory [matches]
+#
+# Every measurement runs in a fresh interpreter so ru_maxrss is the peak of that run alone.
+
+import sys
+import resource
+import subprocess
+import numpy as np
+
+from ipl_helper.ipl_helper import OutcomeBits
+
+SAMPLE_COUNTS = (100_000, 1_000_000, 10_000_000)
+CHUNK = 100_000
+# Runs skipped when their stored arrays alone would not fit in this much memory
+MEMORY_BUDGET = 3 * 2 ** 30
+# A fresh season: every team on zero, the whole fixture list left
+TEAMS = ('CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RCB', 'RR', 'SRH')
+
+
+def peak_rss():
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def schedule(matches):
+    """The first `matches` fixtures of a double round robin"""
+    rounds = [(a, b) for a in TEAMS for b in TEAMS if a != b]
+    return [list(rounds[(7 * k) % len(rounds)]) for k in range(matches)]
+
+
+def fill(layout, samples, matches):
+    """Draw samples x matches results chunk by chunk into the given layout"""
+    rng = np.random.default_rng(0)
+    if layout == 'int64':  # np.random.binomial's default dtype
+        outcomes = np.empty((samples, matches), dtype=np.int64)
+    elif layout == 'bool':
+        outcomes = np.empty((samples, matches), dtype=bool)
+    else:
+        outcomes = OutcomeBits(samples, matches)
+    for start in range(0, samples, CHUNK):
+        size = min(CHUNK, samples - start)
+        chunk = OutcomeBits(size, matches) if layout == 'packed' else None
+        for m_idx in range(matches):
+            a_wins = rng.random(size) < 0.5
+            if layout == 'packed':
+                chunk.set(m_idx, a_wins)
+            else:
+                outcomes[start:start + size, m_idx] = a_wins
+        if layout == 'packed':
+            outcomes[start:start + size] = chunk
+    return outcomes
+
+
+def run(kind, samples, matches):
+    """SimulateSeason / SimulateSamples on a fresh season, or a synthetic fill of one layout"""
+    from ipl_helper import SimulateSeason, SimulateSamples
+    T = {team: [0, 0.0] for team in TEAMS}
+    if kind == 'SimulateSeason':
+        SimulateSeason(T, 0, schedule(matches), samples, seed=0)
+    elif kind == 'SimulateSamples':
+        SimulateSamples(T, 0, schedule(matches), samples, seed=0)
+    else:
+        fill(kind, samples, matches)
+
+
+def child(kind, samples, matches):
+    import ipl_helper  # noqa: F401  (imports are not part of the measurement)
+    before = peak_rss()
+    run(kind, samples, matches)
+    print(peak_rss() - before)
+    if kind == 'packed':
+        # Unpacking must give back exactly what was drawn
+        reference = fill('bool', min(samples, CHUNK), matches)
+        head = fill('packed', min(samples, CHUNK), matches)
+        assert np.array_equal(head.rows(), reference)
+        assert all(np.array_equal(head.column(m), reference[:, m]) for m in range(matches))
+
+
+def measure(kind, samples, matches):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_memory', '--child', kind,
+                             str(samples), str(matches)], check=True, capture_output=True, text=True)
+    return int(output.stdout.split()[0])
+
+
+def table(title, stored_bytes, samples_counts, matches):
+    """One row per sample count, one column per kind; stored_bytes(kind) is bytes per sample"""
+    kinds = list(stored_bytes)
+    print(title)
+    print(f"{'samples':>12} " + ' '.join(f"{kind:>16}" for kind in kinds))
+    for samples in samples_counts:
+        cells = []
+        for kind in kinds:
+            if samples * stored_bytes[kind] > MEMORY_BUDGET:
+                cells.append(f"{samples * stored_bytes[kind] / 2 ** 20:>13.0f}MB*")
+            else:
+                cells.append(f"{measure(kind, samples, matches) / 2 ** 20:>14.1f}MB")
+        print(f"{samples:>12,} " + ' '.join(cells))
+
+
+def main():
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 70
+    words = 8 * ((matches + 63) // 64)
+    print(f"{matches} matches per sample; peak RSS above interpreter start-up and imports")
+    # SampleSet keeps packed outcomes, float16 probabilities and int8 positions per sample
+    table("Engine", {'SimulateSeason': 0, 'SimulateSamples': words + 2 * matches + len(TEAMS)},
+          SAMPLE_COUNTS, matches)
+    table("Outcome layouts alone", {'int64': 8 * matches, 'bool': matches, 'packed': words},
+          SAMPLE_COUNTS, matches)
+    print("* not run: stored arrays alone, above the memory budget")
+
+
+if __name__ == '__main__':
+    main()
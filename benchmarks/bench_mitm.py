@@ -0,0 +1,74 @@
+# RCBinator
+# Benchmark: exact form-free outlook by meet-in-the-middle, 18 to 36 remaining matches
+#
+#   python -m benchmarks.bench_mitm [max_matches]
+#
+# Checked against brute-force enumeration of all 2^n outcomes on short schedules first.
+
+import os
+import sys
+import time
+import numpy as np
+
+from ipl_helper.meet_in_middle import ExactOutlook, MyTeamExact, half_distribution, static_probabilities
+from ipl_helper.snapshot import load_snapshot
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+BRUTE_FORCE_SIZES = (1, 5, 10, 14, 16)
+TIMED_SIZES = (18, 24, 30, 36)
+
+
+def brute_force(T, S):
+    """Position matrix of the form-free model by enumerating every outcome"""
+    names = list(T.keys())
+    index = {t: i for i, t in enumerate(names)}
+    p = np.array(static_probabilities(T, S))
+    n = len(S)
+    a_wins = (np.arange(1 << n)[:, None] >> np.arange(n)) & 1
+    weight = np.prod(np.where(a_wins, p, 1 - p), axis=1)
+    points = np.tile(np.array([T[t][0] for t in names], dtype=np.int64), (1 << n, 1))
+    for m_idx, (a, b) in enumerate(S):
+        points[:, index[a]] += 2 * a_wins[:, m_idx]
+        points[:, index[b]] += 2 * (1 - a_wins[:, m_idx])
+    # Points first, then current NRR, then table order (the stable ranking)
+    nrr_rank = np.argsort(np.argsort([-T[t][1] for t in names], kind='stable'), kind='stable')
+    order = np.argsort(-points * len(names) + nrr_rank, axis=1, kind='stable')
+    matrix = np.zeros((len(names), len(names)))
+    for position in range(len(names)):
+        np.add.at(matrix, (order[:, position], position), weight)
+    return matrix
+
+
+def main():
+    max_matches = int(sys.argv[1]) if len(sys.argv) > 1 else max(TIMED_SIZES)
+    season = load_snapshot(FIXTURE_SNAPSHOT)
+    T, S = season.points_table(), season.full_schedule()
+    print(f"{len(S)} fixtures in the season; slicing the last n as the remaining schedule")
+
+    for n in BRUTE_FORCE_SIZES:
+        exact = ExactOutlook(T, 0, S[-n:])
+        assert np.allclose(exact.matrix, brute_force(T, S[-n:]), rtol=0, atol=1e-12), f'{n} matches differ'
+        assert np.allclose(exact.matrix.sum(axis=0), 1) and np.allclose(exact.matrix.sum(axis=1), 1)
+    print(f"brute force: agrees on {', '.join(map(str, BRUTE_FORCE_SIZES))} matches")
+
+    print(f"{'matches':>8} {'half sizes':>16} {'one team':>10} {'all teams':>10}")
+    for n in TIMED_SIZES:
+        if n > max_matches:
+            break
+        index = {t: i for i, t in enumerate(T)}
+        matches = [(index[a], index[b]) for a, b in S[-n:]]
+        p = static_probabilities(T, S[-n:])
+        sizes = [len(half_distribution(part, q, len(T))[1])
+                 for part, q in ((matches[:n // 2], p[:n // 2]), (matches[n // 2:], p[n // 2:]))]
+        start = time.perf_counter()
+        MyTeamExact('RCB', T, 0, S[-n:])
+        one = time.perf_counter() - start
+        start = time.perf_counter()
+        outlook = ExactOutlook(T, 0, S[-n:])
+        every = time.perf_counter() - start
+        assert np.allclose(outlook.matrix.sum(axis=0), 1) and np.allclose(outlook.matrix.sum(axis=1), 1)
+        print(f"{n:>8} {sizes[0]:>7,} x {sizes[1]:<6,} {one:>9.2f}s {every:>9.2f}s")
+
+
+if __name__ == '__main__':
+    main()
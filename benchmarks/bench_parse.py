@@ -0,0 +1,111 @@
+# RCBinator
+# Benchmark: full-tree vs strained parsing of the saved Cricbuzz fixture pages
+#
+#   python -m benchmarks.bench_parse [repeats]
+#
+# Each page is timed as one full parse against one strained parse, so the strainer's gain
+# is reported apart from the refresh no longer parsing the matches page twice.
+
+import os
+import re
+import sys
+import time
+from bs4 import BeautifulSoup
+
+from ipl_helper import cricbuzz_scraper as scraper
+from ipl_helper.cricbuzz_scraper import get_abbreviations
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# The parser the original scrapers used
+ORIGINAL_PARSER = 'html.parser'
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+# The original parsers: a full tree of the page, then the same extraction as today
+
+def full_series_url(html, parser):
+    soup = BeautifulSoup(html, parser)
+    return scraper.BASE_URL + soup.find('a', title=scraper.SERIES_TITLE)['href']
+
+
+def full_match_texts(html, parser):
+    soup = BeautifulSoup(html, parser)
+    return [x.get_text() for x in soup.find_all('div', class_='cb-series-matches')]
+
+
+def full_points_table(html, parser):
+    soup = BeautifulSoup(html, parser)
+    teams = soup.find('table', class_='table cb-srs-pnts')
+    table = [x.get_text() for x in teams.find_all('td', class_='cb-srs-pnts-name')]
+    table = [''.join([word[0] for word in x.split()]) for x in table]
+    table = [x.replace('SH', 'SRH') for x in table]
+    table = [x.replace('PK', 'PBSK') for x in table]
+    table = [re.sub(r'[^a-zA-Z]', '', text) for text in table]
+    cells = [x.get_text() for x in teams.find_all('td', class_='cb-srs-pnts-td')]
+    return {t: [int(p), float(n)] for t, p, n in zip(table, cells[5::7], cells[6::7])}
+
+
+def original_refresh(series_html, matches_html, table_html):
+    """The original refresh: full html.parser trees, the matches page parsed twice"""
+    series_url = full_series_url(series_html, ORIGINAL_PARSER)
+    played = sum([1 for x in full_match_texts(matches_html, ORIGINAL_PARSER) if 'won' in x])
+    schedule = [x.split(',')[0].strip() for x in full_match_texts(matches_html, ORIGINAL_PARSER)]
+    schedule = [list(map(lambda x: x.strip(), x.split('vs'))) for x in schedule]
+    schedule = [get_abbreviations(x) for x in schedule][:-4]
+    return series_url, played, schedule, full_points_table(table_html, ORIGINAL_PARSER)
+
+
+def current_refresh(series_html, matches_html, table_html):
+    snapshot = scraper.build_snapshot(matches_html, table_html)
+    return (scraper.parse_series_url(series_html), snapshot.matches_done,
+            snapshot.full_schedule(), snapshot.points_table())
+
+
+def timed(func, args, repeats):
+    """Median seconds per call (the median keeps one slow run from skewing the figure)"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    return result, sorted(times)[len(times) // 2]
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 21
+    series_html, matches_html, table_html = pages = [
+        read_fixture(name) for name in ('series.html', 'matches.html', 'points-table.html')]
+    parser = scraper.HTML_PARSER
+    print(f"parser: {parser}, {sum(len(p) for p in pages) / 1024:.0f} KB of fixtures, "
+          f"median of {repeats} runs")
+
+    # One full parse against one strained parse per page, same parser
+    print(f"{'page':<14} {'full tree':>10} {'strained':>10} {'strainer gain':>14}")
+    per_page = (('series', full_series_url, scraper.parse_series_url, series_html),
+                ('matches', full_match_texts, scraper._match_texts, matches_html),
+                ('points table', full_points_table, scraper.parse_points_table, table_html))
+    full_matches = 0.0
+    for name, full, strained, html in per_page:
+        expected, full_time = timed(full, (html, parser), repeats)
+        actual, strained_time = timed(strained, (html,), repeats)
+        assert actual == expected, f'strained parsing changed the {name} data'
+        if name == 'matches':
+            full_matches = full_time
+        print(f"{name:<14} {full_time * 1000:8.1f}ms {strained_time * 1000:8.1f}ms "
+              f"{full_time / strained_time:13.2f}x")
+
+    # The whole refresh, against the original (html.parser, matches page twice)
+    expected, original_time = timed(original_refresh, pages, repeats)
+    actual, current_time = timed(current_refresh, pages, repeats)
+    assert actual == expected, 'targeted parsing changed the scraped data'
+    print(f"refresh: original {original_time * 1000:.1f} ms, now {current_time * 1000:.1f} ms "
+          f"({original_time / current_time:.2f}x); parsing the matches page once saves "
+          f"{full_matches * 1000:.1f} ms of that")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# RCBinator
+# Benchmark: first request (simulate) vs repeat requests (served by the result cache)
+#
+#   python -m benchmarks.bench_result_cache [simulations]
+
+import os
+import sys
+import time
+
+from ipl_helper import SimulateSeason
+from ipl_helper.snapshot import load_snapshot
+from ipl_helper.result_cache import ResultCache, result_key
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+SEED = 2025
+
+
+def main():
+    simulations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    season = load_snapshot(FIXTURE_SNAPSHOT)
+    T, S = season.points_table(), season.remaining_schedule()
+    cache = ResultCache(max_entries=40)
+
+    start = time.perf_counter()
+    outlook = SimulateSeason(T, season.matches_done, S, simulations, seed=SEED)
+    cache.put_outlook(outlook, T, S, simulations, SEED)
+    miss_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for team in outlook.teams:
+        for fp in (1, 2, 4):
+            prob = cache.get(result_key(T, S, team, fp, simulations, SEED))[0]
+            assert prob == outlook.probability(team, fp)
+    hit_time = (time.perf_counter() - start) / (3 * len(outlook.teams))
+
+    # A different seed is a different question; a small cache evicts the oldest answers
+    cache.put_outlook(SimulateSeason(T, season.matches_done, S, simulations, seed=SEED + 1),
+                      T, S, simulations, SEED + 1)
+    assert cache.get(result_key(T, S, outlook.teams[0], 1, simulations, SEED)) is None
+
+    print(f"{len(S)} matches left, {simulations:,} samples")
+    print(f"miss (simulate all teams): {miss_time * 1000:9.1f} ms")
+    print(f"hit (one team/threshold):  {hit_time * 1000:9.3f} ms")
+    print(f"cache stats: {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# RCBinator
+# Benchmark: most-likely qualifying scenario by beam search vs exhaustive search
+#
+#   python -m benchmarks.bench_scenarios [team]
+
+import os
+import sys
+import time
+
+from ipl_helper import MostLikelyScenarios
+from ipl_helper.snapshot import load_snapshot
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+EXHAUSTIVE_MATCHES = 14
+
+
+def timed(*args, **kwargs):
+    start = time.perf_counter()
+    result = MostLikelyScenarios(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    team = sys.argv[1] if len(sys.argv) > 1 else 'RCB'
+    season = load_snapshot(FIXTURE_SNAPSHOT)
+    T, S = season.points_table(), season.remaining_schedule()
+
+    # A beam wide enough to hold every scenario is an exhaustive search
+    short = S[:EXHAUSTIVE_MATCHES]
+    exhaustive, exhaustive_time = timed(team, T, short, 4, top_k=5, beam_width=1 << EXHAUSTIVE_MATCHES)
+    beam, beam_time = timed(team, T, short, 4, top_k=5)
+    assert [p for p, _, _ in beam] == [p for p, _, _ in exhaustive], 'beam missed a top-5 scenario'
+    print(f"{EXHAUSTIVE_MATCHES} matches: beam {beam_time * 1000:.1f} ms, "
+          f"exhaustive {exhaustive_time * 1000:.1f} ms, same top 5")
+
+    full, full_time = timed(team, T, S, 4, top_k=5)
+    wide, wide_time = timed(team, T, S, 4, top_k=5, beam_width=1 << 15)
+    assert [p for p, _, _ in full] == [p for p, _, _ in wide], 'a 16x wider beam found better scenarios'
+    print(f"{len(S)} matches: beam {full_time * 1000:.1f} ms, 16x wider beam {wide_time * 1000:.1f} ms, same top 5")
+    for probability, example_out, example_tab in full:
+        finish = list(example_tab).index(team) + 1
+        print(f"  {probability:.3e}  {team} finish #{finish} on {example_tab[team][0]} points")
+
+
+if __name__ == '__main__':
+    main()
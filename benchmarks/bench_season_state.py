@@ -0,0 +1,66 @@
+# RCBinator
+# Benchmark: SeasonState vs the dict table / list schedule it replaces
+#
+#   python -m benchmarks.bench_season_state [repeats]
+
+import os
+import sys
+import time
+import pickle
+import threading
+import numpy as np
+
+from ipl_helper import MyTeam
+from ipl_helper.season_state import SeasonState
+from ipl_helper.snapshot import load_snapshot
+from ipl_helper.result_cache import season_key, result_key
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+
+
+def timed(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    state = load_snapshot(FIXTURE_SNAPSHOT)
+    T, S = state.points_table(), state.remaining_schedule()
+
+    # Same season, same keys and answers whichever form is passed in
+    assert season_key(state, None) == season_key(T, S)
+    assert result_key(state, None, 'RCB', 4, 50_000, 1) == result_key(T, S, 'RCB', 4, 50_000, 1)
+    assert MyTeam('RCB', state, simulations=50_000, seed=1)[0] == MyTeam('RCB', T, state.matches_done, S, 4,
+                                                                        50_000, seed=1)[0]
+
+    # Immutable, and equal states (e.g. one that went through a pickle) hash equal
+    copy = pickle.loads(pickle.dumps(state))
+    assert copy == state and hash(copy) == hash(state) and len({state, copy}) == 1
+    try:
+        state.points[0] = 99
+        raise AssertionError('points should be read-only')
+    except ValueError:
+        pass
+
+    # Threads read the fixture matrix in place: the view shares the state's memory
+    views = []
+    thread = threading.Thread(target=lambda: views.append(state.remaining_fixtures()))
+    thread.start()
+    thread.join()
+    assert np.shares_memory(views[0], state.fixtures)
+
+    array_bytes = sum(a.nbytes for a in (state.points, state.nrr, state.fixtures, state.winners))
+    print(f"{len(state.teams)} teams, {len(state.fixtures)} fixtures ({state.matches_done} played)")
+    print(f"arrays: {array_bytes} bytes; pickle {len(pickle.dumps(state))} bytes "
+          f"vs {len(pickle.dumps((T, state.matches_done, state.full_schedule())))} for dict + lists")
+    print(f"season_key (dict, hashed each call): {timed(lambda: season_key(T, S), repeats):8.4f} ms")
+    print(f"season_key (SeasonState, memoized):  {timed(lambda: season_key(state, None), repeats):8.4f} ms")
+    fresh = lambda: SeasonState(state.teams, state.points, state.nrr, state.fixtures, state.matches_done)
+    print(f"hash() of a fresh SeasonState:       {timed(lambda: hash(fresh()), repeats):8.4f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# RCBinator
+# Benchmark: scraping the stand-in vs replaying a saved season snapshot
+#
+#   python -m benchmarks.bench_snapshot [repeats]
+
+import os
+import sys
+import time
+import tempfile
+
+from ipl_helper import snapshot
+from ipl_helper.cricbuzz_scraper import CricbuzzClient, fetch_season
+from benchmarks.cricbuzz_standin import StandInServer
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    server = StandInServer().start()
+
+    start = time.perf_counter()
+    live = CricbuzzClient(base_url=server.url).fetch_season()
+    scrape_time = time.perf_counter() - start
+    server.shutdown()
+
+    path = os.path.join(tempfile.mkdtemp(), 'season.json')
+    snapshot.save_snapshot(live, path)
+    assert snapshot.load_snapshot(FIXTURE_SNAPSHOT) == live, 'fixtures/season.json is out of date'
+
+    # Replay goes through the same entry point the apps and AllTeams() use
+    snapshot.replay(path)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        replayed = fetch_season()
+    load_time = (time.perf_counter() - start) / repeats
+    snapshot.replay(None)
+
+    assert replayed == live, 'replayed snapshot differs from the scraped season'
+    print(f"snapshot: {os.path.getsize(path) / 1024:.1f} KB, "
+          f"{live.matches_done} of {len(live.schedule)} matches played")
+    print(f"scrape (local stand-in): {scrape_time * 1000:7.1f} ms")
+    print(f"replay from disk:        {load_time * 1000:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
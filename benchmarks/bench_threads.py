@@ -0,0 +1,70 @@
+# RCBinator
+# Benchmark: concurrent runs on shared engines match the same runs done one at a time
+#
+#   python -m benchmarks.bench_threads [threads]
+
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from ipl_helper import Engine, DEFAULT_ENGINE
+from ipl_helper.snapshot import load_snapshot
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+# A second model, to check that engines with different config do not interfere
+FORM_HEAVY = Engine(form_weight=0.5, points_weight=0.4, nrr_weight=0.1)
+
+
+def make_runs(season):
+    T, S = season.points_table(), season.remaining_schedule()
+    done = season.matches_done
+    runs = []
+    for engine in (DEFAULT_ENGINE, FORM_HEAVY):
+        for seed in (1, 2):
+            # Exact enumeration (short schedule) and Monte Carlo (full schedule)
+            runs.append((engine.simulate_season, (T, done, S[-14:], 0), {'seed': seed}))
+            runs.append((engine.simulate_season, (T, done, S, 60_000), {'seed': seed, 'chunk_size': 20_000}))
+        runs.append((engine.my_team, ('RCB', T, done, S, 4, 60_000), {'seed': 3}))
+        runs.append((engine.most_likely_scenarios, ('DC', T, S, 2), {'top_k': 3, 'beam_width': 256}))
+    return runs
+
+
+def summary(result):
+    """Comparable form of a run's result"""
+    if hasattr(result, 'matrix'):
+        return result.matrix
+    return result
+
+
+def same(a, b):
+    if isinstance(a, np.ndarray):
+        return np.array_equal(a, b)
+    return a == b
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    runs = make_runs(load_snapshot(FIXTURE_SNAPSHOT))
+
+    start = time.perf_counter()
+    serial = [summary(func(*args, **kwargs)) for func, args, kwargs in runs]
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        # Every run twice, interleaved, so runs on the same engine overlap
+        futures = [pool.submit(func, *args, **kwargs) for func, args, kwargs in runs + runs]
+        concurrent = [summary(future.result()) for future in futures]
+    concurrent_time = time.perf_counter() - start
+
+    for i, result in enumerate(concurrent):
+        assert same(result, serial[i % len(runs)]), f"run {i % len(runs)} differs under threads"
+    assert not same(serial[0], serial[len(runs) // 2]), "engines should give different answers"
+    print(f"{len(runs)} runs serially in {serial_time:.2f}s; "
+          f"{len(concurrent)} on {threads} threads in {concurrent_time:.2f}s, all identical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# RCBinator
+# Benchmark: what-if answers from stored samples vs a fresh run with the results forced
+#
+#   python -m benchmarks.bench_whatif [simulations]
+
+import os
+import sys
+import time
+import numpy as np
+
+from ipl_helper import SimulateSeason, SimulateSamples
+from ipl_helper.snapshot import load_snapshot
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'season.json')
+SEED = 7
+TEAM = 'RCB'
+
+
+def main():
+    simulations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    season = load_snapshot(FIXTURE_SNAPSHOT)
+    T, S = season.points_table(), season.remaining_schedule()
+
+    start = time.perf_counter()
+    samples = SimulateSamples(T, season.matches_done, S, simulations, seed=SEED)
+    build_time = time.perf_counter() - start
+
+    # No pins: the stored samples reproduce SimulateSeason with the same seed
+    outlook = SimulateSeason(T, season.matches_done, S, simulations, seed=SEED)
+    assert np.isclose(samples.what_if(TEAM, 4)[0], outlook.probability(TEAM, 4))
+
+    own = [m for m, match in enumerate(S) if TEAM in match]
+    others = [m for m, match in enumerate(S) if TEAM not in match]
+    questions = [
+        {own[0]: TEAM},
+        {own[0]: TEAM, others[0]: S[others[0]][1]},
+        {m: TEAM for m in own[:3]},
+        {m: S[m][1] for m in others[:8]},  # Too specific for the stored samples
+    ]
+    print(f"{len(S)} matches left, {simulations:,} stored samples built in {build_time:.2f}s")
+    for pinned in questions:
+        start = time.perf_counter()
+        prob, effective, reused = samples.what_if(TEAM, 4, pinned)
+        elapsed = time.perf_counter() - start
+
+        # Reference: a fresh, larger run with the pinned matches forced
+        reference, _, _ = samples.what_if(TEAM, 4, pinned, min_samples=float('inf'),
+                                          resimulations=100_000)
+        se = np.sqrt(max(reference, 1.0) / 100 * (1 - reference / 100) / min(effective, 100_000)) * 100
+        assert abs(prob - reference) <= 5 * se + 0.5, (pinned, prob, reference)
+        how = 'reweighted' if reused else 're-simulated'
+        print(f"{len(pinned)} pins: {prob:6.2f}% ({how}, {effective:,} effective samples) "
+              f"in {elapsed * 1000:6.1f} ms; forced run {reference:6.2f}%")
+
+
+if __name__ == '__main__':
+    main()
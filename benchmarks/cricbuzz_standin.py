@@ -0,0 +1,87 @@
+# RCBinator
+# Local stand-in for Cricbuzz that serves the saved HTML fixtures
+#
+#   python -m benchmarks.cricbuzz_standin [port] [latency_seconds]
+#
+# Point a client at it with CricbuzzClient(base_url=server.url). Responses carry an
+# ETag and Last-Modified and honour If-None-Match / If-Modified-Since with a 304.
+
+import os
+import sys
+import time
+import hashlib
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture_for(path):
+    """Map a Cricbuzz URL path onto a fixture file"""
+    if path.rstrip('/') == '/cricket-series':
+        return 'series.html'
+    if path.endswith('/matches'):
+        return 'matches.html'
+    if path.endswith('/points-table'):
+        return 'points-table.html'
+    return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        time.sleep(self.latency)
+        name = fixture_for(self.path)
+        if name is None:
+            self.send_error(404)
+            return
+
+        path = os.path.join(FIXTURES, name)
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        last_modified = formatdate(os.path.getmtime(path), usegmt=True)
+
+        if self.headers.get('If-None-Match') == etag or self.headers.get('If-Modified-Since') == last_modified:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0):
+        handler = type('Handler', (StandInHandler,), {'latency': latency})
+        super().__init__(('127.0.0.1', port), handler)
+        self.requests = []
+        self.not_modified = 0
+        self.url = 'http://127.0.0.1:%d' % self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server = StandInServer(port, latency)
+    print('Serving fixtures on', server.url)
+    server.serve_forever()
@@ -1 +1,3 @@
-from .ipl_helper import MyTeam, AllTeams
\ No newline at end of file
+from .ipl_helper import MyTeam, MyTeamInterval, MyTeamRare, AllTeams, SimulateSeason, SeasonOutlook, SimulateSamples, MyTeamWhatIf, MostLikelyScenarios, Engine, DEFAULT_ENGINE
+from .season_state import SeasonState
+from .meet_in_middle import ExactOutlook, MyTeamExact
\ No newline at end of file
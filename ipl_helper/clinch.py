@@ -0,0 +1,112 @@
+# RCBinator
+# Mathematical clinch / elimination checks on points alone
+
+from itertools import combinations
+
+CLINCHED = 'clinched'
+ELIMINATED = 'eliminated'
+
+
+def _max_flow(games, capacity):
+    """Most games that can be handed to a winner without a team exceeding its capacity.
+
+    games is a list of (i, j) team pairs; capacity[t] is how many wins team t may take
+    (teams missing from capacity take none). Augmenting paths on the game/team bipartite graph.
+    """
+    assigned = {}  # game index -> team that won it
+    load = {t: 0 for t in capacity}
+    games_of = {}
+    for g, (i, j) in enumerate(games):
+        games_of.setdefault(i, []).append(g)
+        games_of.setdefault(j, []).append(g)
+
+    def augment(g, seen):
+        for t in games[g]:
+            if t not in capacity or t in seen:
+                continue
+            seen.add(t)
+            if load[t] < capacity[t]:
+                load[t] += 1
+                assigned[g] = t
+                return True
+            # Try to move one of t's games to its other team
+            for other in games_of.get(t, []):
+                if assigned.get(other) == t and augment(other, seen):
+                    assigned[g] = t
+                    return True
+        return False
+
+    return sum(1 for g in range(len(games)) if augment(g, set()))
+
+
+def _remaining_games(team, S):
+    """Split the schedule into team's own opponents and the games between other teams"""
+    own, others = [], []
+    for team_a, team_b in S:
+        if team in (team_a, team_b):
+            own.append(team_b if team_a == team else team_a)
+        else:
+            others.append((team_a, team_b))
+    return own, others
+
+
+def is_clinched(team, T, S, for_position):
+    """True if team finishes in the top for_position in every outcome of S.
+
+    Worst case for team: it loses every remaining match and loses every tie on NRR.
+    Clinched unless some set of for_position other teams can all reach team's points.
+    """
+    rivals = [t for t in T if t != team]
+    if for_position > len(rivals):
+        return True
+    own, others = _remaining_games(team, S)
+    floor = T[team][0]
+    points = {t: T[t][0] for t in rivals}
+    for opponent in own:
+        points[opponent] += 2
+
+    # Wins each rival still needs to draw level with team
+    need = {t: max(0, -(-(floor - points[t]) // 2)) for t in rivals}
+    for group in combinations(rivals, for_position):
+        demand = sum(need[t] for t in group)
+        if demand == 0:
+            return False
+        capacity = {t: need[t] for t in group}
+        if _max_flow(others, capacity) >= demand:
+            return False
+    return True
+
+
+def is_eliminated(team, T, S, for_position):
+    """True if team misses the top for_position in every outcome of S.
+
+    Best case for team: it wins every remaining match and wins every tie on NRR.
+    Not eliminated if, after letting some for_position - 1 rivals finish anywhere, every
+    game can go to a team that still stays on or below team's best points total.
+    """
+    rivals = [t for t in T if t != team]
+    if for_position > len(rivals):
+        return False
+    own, others = _remaining_games(team, S)
+    ceiling = T[team][0] + 2 * len(own)
+
+    # Wins each rival can take without passing team
+    room = {t: (ceiling - T[t][0]) // 2 for t in rivals}
+    for free in combinations(rivals, for_position - 1):
+        capped = [t for t in rivals if t not in free]
+        if any(room[t] < 0 for t in capped):
+            continue
+        capacity = {t: room[t] for t in capped}
+        capacity.update({t: len(others) for t in free})
+        if _max_flow(others, capacity) == len(others):
+            return False
+    return True
+
+
+def clinch_status(team, T, S, for_position):
+    """CLINCHED, ELIMINATED or None when the remaining schedule S can still decide it"""
+    if is_clinched(team, T, S, for_position):
+        return CLINCHED
+    if is_eliminated(team, T, S, for_position):
+        return ELIMINATED
+    return None
@@ -1,21 +1,179 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 import random
 import re
 import numpy as np
 import copy
 
+from ipl_helper.http_cache import ResponseCache
+from ipl_helper.season_state import SeasonState
+from ipl_helper.snapshot import load_snapshot, replay_path
 
-def get_ipl_page_url():
-    base_url = "https://www.cricbuzz.com"
-    series_url = base_url + "/cricket-series"
-    response = requests.get(series_url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    ipl_page_url = soup.find('a', title='Indian Premier League 2025')['href']
+BASE_URL = "https://www.cricbuzz.com"
+SERIES_TITLE = 'Indian Premier League 2025'
+# Seconds to wait for Cricbuzz before giving up on a page
+REQUEST_TIMEOUT = 10
+# Attempts per page in the async fetch (timeouts, connection errors, 5xx), with exponential backoff
+FETCH_RETRIES = 3
+RETRY_BACKOFF = 0.5
+
+# lxml builds trees several times faster than the stdlib parser; use it when installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+def _has_classes(*names):
+    # While parsing, the strainer sees the raw class attribute ("cb-col-100 cb-col ...")
+    return lambda value: value is not None and set(names) <= set(value.split())
+
+
+# Only these subtrees of the (large) Cricbuzz pages are ever read
+SERIES_LINK = SoupStrainer('a', title=SERIES_TITLE)
+MATCH_CARDS = SoupStrainer('div', class_=_has_classes('cb-series-matches'))
+POINTS_TABLE = SoupStrainer('table', class_=_has_classes('table', 'cb-srs-pnts'))
+
+
+def pooled_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class CricbuzzClient:
+    """Cricbuzz scraper over one pooled requests.Session.
+
+    The series URL is resolved once per client and every page is downloaded once per
+    fetch_season() call. With a ResponseCache, pages come from the cache instead
+    (which shares the same session for its own requests).
+    """
+
+    def __init__(self, session=None, timeout=REQUEST_TIMEOUT, cache=None, base_url=BASE_URL):
+        self.session = session or pooled_session()
+        self.timeout = timeout
+        self.cache = cache
+        self.base_url = base_url
+        self._series_url = None
+
+    def get(self, url, timeout=None):
+        """Page body; timeout (seconds) overrides the client's for this request"""
+        timeout = self.timeout if timeout is None else timeout
+        if self.cache is not None:
+            return self.cache.get(url, timeout)
+        response = self.session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    def series_url(self):
+        if self._series_url is None:
+            html = self.get(self.base_url + "/cricket-series")
+            self._series_url = parse_series_url(html, self.base_url)
+        return self._series_url
+
+    def fetch_season(self):
+        """Download the matches and points-table pages once and build a SeasonState"""
+        url = self.series_url()
+        matches_html = self.get(url + '/matches')
+        table_html = self.get(url + '/points-table')
+        return build_snapshot(matches_html, table_html)
+
+
+def build_snapshot(matches_html, table_html):
+    points_table = parse_points_table(table_html)
+    match_texts = _match_texts(matches_html)  # Parse the matches page once for both
+    return SeasonState.from_rows(
+        table=[(team, pts, nrr) for team, (pts, nrr) in points_table.items()],
+        schedule=_schedule_from_texts(match_texts),
+        matches_done=_played_from_texts(match_texts),
+        results=_results_from_texts(match_texts),
+    )
+
+
+_default_client = None
+
+
+def get_client():
+    """Process-wide CricbuzzClient shared by every caller"""
+    global _default_client
+    if _default_client is None:
+        session = pooled_session()
+        cache = ResponseCache(session=session, timeout=REQUEST_TIMEOUT)
+        _default_client = CricbuzzClient(session=session, cache=cache)
+    return _default_client
+
+
+def _retryable(error):
+    """Timeouts, dropped connections and 5xx answers may pass; a 4xx will not change on retry"""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+
+async def _with_retries(func, url, timeout, retries):
+    """Run a blocking fetch in a worker thread with bounded retries.
+
+    The timeout goes to the request itself, so a timed-out attempt has ended (and its
+    thread is free) before the next one starts.
+    """
+    for attempt in range(retries):
+        try:
+            return await asyncio.to_thread(func, url, timeout)
+        except requests.RequestException as error:
+            if attempt == retries - 1 or not _retryable(error):
+                raise
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+async def fetch_season_async(client=None, timeout=REQUEST_TIMEOUT, retries=FETCH_RETRIES):
+    """fetch_season() with the matches and points-table pages downloaded concurrently.
+
+    The series URL is resolved first (once per client); both pages are then fetched
+    at the same time, so a cold load costs about the slowest single page.
+    """
+    client = client or get_client()
+    if client._series_url is None:
+        html = await _with_retries(client.get, client.base_url + "/cricket-series", timeout, retries)
+        client._series_url = parse_series_url(html, client.base_url)
+    url = client.series_url()
+    matches_html, table_html = await asyncio.gather(
+        _with_retries(client.get, url + '/matches', timeout, retries),
+        _with_retries(client.get, url + '/points-table', timeout, retries),
+    )
+    return build_snapshot(matches_html, table_html)
+
+
+def fetch_season():
+    """One SeasonState (table, full schedule, completed count) per data refresh.
+
+    In replay mode (RCBINATOR_SNAPSHOT or snapshot.replay()) the saved snapshot is
+    loaded instead and Cricbuzz is never contacted.
+    """
+    if replay_path() is not None:
+        return load_snapshot(replay_path())
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_season_async())
+    # Already inside an event loop (e.g. a notebook): fetch the pages one by one
+    return get_client().fetch_season()
+
+
+def parse_series_url(html, base_url=BASE_URL):
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SERIES_LINK)
+    ipl_page_url = soup.find('a', title=SERIES_TITLE)['href']
     if not ipl_page_url:
         return None
-    ipl_page_url = base_url + ipl_page_url
-    return ipl_page_url
+    return base_url + ipl_page_url
+
+
+def get_ipl_page_url():
+    return get_client().series_url()
 
 def get_abbreviations(team_names):
     abbreviations = []
@@ -28,21 +186,30 @@ def get_abbreviations(team_names):
         abbreviations.append(abbreviation)
     return abbreviations
 
-def matches_played():
-    url = get_ipl_page_url()  + '/matches'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+def _match_texts(html):
+    """Text of every match card on the /matches page"""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=MATCH_CARDS)
     matches = soup.find_all('div', class_='cb-series-matches')
-    schedule = [x.get_text() for x in matches]
+    return [x.get_text() for x in matches]
+
+
+def _played_from_texts(schedule):
     return sum([1 for x in schedule if 'won' in x])
 
 
-def get_ipl_schedule():
-    url = get_ipl_page_url()  + '/matches'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    matches = soup.find_all('div', class_='cb-series-matches')
-    schedule = [x.get_text() for x in matches]
+def _results_from_texts(schedule):
+    """Winner's abbreviation for every completed match card, in page order"""
+    results = []
+    for text in schedule:
+        if 'won' not in text:
+            continue
+        names = [x.strip() for x in text.split(',')[0].split('vs')]
+        winner = [name for name in names if name + ' won' in text]
+        results.append(get_abbreviations(winner)[0] if len(winner) == 1 else None)
+    return results
+
+
+def _schedule_from_texts(schedule):
     schedule = [x.split(',')[0].strip() for x in schedule]
     schedule = [list(map(lambda x: x.strip(), x.split('vs'))) for x in schedule]
     schedule = [get_abbreviations(x) for x in schedule][:-4]
@@ -50,10 +217,16 @@ def get_ipl_schedule():
     return schedule
 
 
-def get_points_table():
-    url = get_ipl_page_url()  + '/points-table'
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+def parse_matches_played(html):
+    return _played_from_texts(_match_texts(html))
+
+
+def parse_schedule(html):
+    return _schedule_from_texts(_match_texts(html))
+
+
+def parse_points_table(html):
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=POINTS_TABLE)
 
     teams = soup.find('table', class_='table cb-srs-pnts')
     table = [x.get_text() for x in teams.find_all('td', class_='cb-srs-pnts-name')]
@@ -69,5 +242,17 @@ def get_points_table():
     points_table = {}
     for team,pts,nrr in zip(table, points, nrr):
         points_table[team] = [pts,nrr]
-    
+
     return points_table
+
+
+def matches_played():
+    return fetch_season().matches_done
+
+
+def get_ipl_schedule():
+    return fetch_season().full_schedule()
+
+
+def get_points_table():
+    return fetch_season().points_table()
@@ -0,0 +1,143 @@
+# RCBinator
+# Disk-backed HTTP response cache for the Cricbuzz scraper
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+import requests
+
+# Seconds a cached page is served without asking Cricbuzz again
+DEFAULT_TTL = int(os.environ.get('RCBINATOR_CACHE_TTL', 300))
+DEFAULT_CACHE_DIR = os.environ.get('RCBINATOR_CACHE_DIR',
+                                   os.path.join(tempfile.gettempdir(), 'rcbinator-cache'))
+
+
+class ResponseCache:
+    """GET-only page cache on disk with a TTL and conditional revalidation.
+
+    Fresh entries (younger than ttl) are served without a request. Stale entries are
+    revalidated with If-None-Match / If-Modified-Since; with stale_while_revalidate the
+    stale body is returned at once and the revalidation runs in a background thread.
+    If Cricbuzz cannot be reached, a stale body is better than none and is served.
+    """
+
+    def __init__(self, session=None, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL,
+                 timeout=10, stale_while_revalidate=True):
+        self.session = session or requests.Session()
+        self.directory = directory
+        self.ttl = ttl
+        self.timeout = timeout
+        self.stale_while_revalidate = stale_while_revalidate
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._revalidating = {}  # url -> background thread
+        self.hits = 0          # Served fresh from disk
+        self.misses = 0        # Nothing cached, full download
+        self.stale = 0         # Served stale while revalidating (or while offline)
+        self.not_modified = 0  # Revalidations answered with 304
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'not_modified': self.not_modified,
+            }
+
+    def get(self, url, timeout=None):
+        """Page body; timeout (seconds) overrides the cache's for a download made here"""
+        entry = self._load(url)
+        if entry is None:
+            self._count('misses')
+            return self._fetch(url, None, timeout)['body']
+
+        if time.time() - entry['fetched_at'] < self.ttl:
+            self._count('hits')
+            return entry['body']
+
+        if self.stale_while_revalidate:
+            self._count('stale')
+            self._revalidate_in_background(url, entry)
+            return entry['body']
+
+        try:
+            return self._fetch(url, entry, timeout)['body']
+        except requests.RequestException:
+            self._count('stale')
+            return entry['body']
+
+    def wait(self):
+        """Block until background revalidations finish"""
+        with self._lock:
+            threads = list(self._revalidating.values())
+        for thread in threads:
+            thread.join()
+
+    def _revalidate_in_background(self, url, entry):
+        with self._lock:
+            if url in self._revalidating:
+                return
+            thread = threading.Thread(target=self._background_fetch, args=(url, entry), daemon=True)
+            self._revalidating[url] = thread
+        thread.start()
+
+    def _background_fetch(self, url, entry):
+        try:
+            self._fetch(url, entry)
+        except requests.RequestException:
+            pass  # Keep serving the stale copy; the next stale hit retries
+        finally:
+            with self._lock:
+                self._revalidating.pop(url, None)
+
+    def _fetch(self, url, entry, timeout=None):
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, headers=headers,
+                                    timeout=self.timeout if timeout is None else timeout)
+        if response.status_code == 304 and entry is not None:
+            self._count('not_modified')
+            entry = dict(entry, fetched_at=time.time())
+        else:
+            response.raise_for_status()
+            entry = {
+                'url': url,
+                'fetched_at': time.time(),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'body': response.text,
+            }
+        self._store(url, entry)
+        return entry
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + '.json')
+
+    def _load(self, url):
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, url, entry):
+        # Write then rename, so concurrent readers never see a half-written entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(url))
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
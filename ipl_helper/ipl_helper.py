@@ -6,10 +6,16 @@ import random
 import numpy as np
 import copy
 import math
+import time
+import concurrent.futures
 from datetime import datetime, timedelta
 from collections import deque
+from statistics import NormalDist
 
-from ipl_helper.cricbuzz_scraper import get_ipl_schedule, get_points_table, matches_played
+from ipl_helper.cricbuzz_scraper import fetch_season
+from ipl_helper.clinch import clinch_status, CLINCHED
+from ipl_helper.season_state import SeasonState
+from ipl_helper import kernels
 
 # Recent form weightage (last 3-5 matches)
 FORM_WEIGHT = 0.3
@@ -20,11 +26,26 @@ NRR_WEIGHT = 0.1
 # Track the last n matches for each team
 RECENT_MATCHES_WINDOW = 3  # Consider only the last 3 matches
 
-# Initialize form and track recent match results
-team_form = {team: 0.5 for team in ["CSK", "DC", "GT", "MI", "PBSK", "RR", "RCB", "SRH", "KKR", "LSG"]}
-recent_results = {team: deque(maxlen=RECENT_MATCHES_WINDOW) for team in ["CSK", "DC", "GT", "MI", "PBSK", "RR", "RCB", "SRH", "KKR", "LSG"]}
+# Exact enumeration of every outcome up to this many remaining matches
+EXACT_MATCH_LIMIT = 22
+# Last matches of the schedule expanded breadth-first with NumPy during exact enumeration
+EXACT_VECTOR_DEPTH = 14
+# Monte Carlo samples simulated per chunk; bounds peak memory for any sample count
+MC_CHUNK_SIZE = 100_000
+# Smaller batches for precision-targeted runs, so near-decided teams stop early
+ADAPTIVE_BATCH_SIZE = 2_000
+# What-if questions are answered from stored samples while at least this many effective
+# samples agree with the pinned results; otherwise only the unpinned matches are re-simulated
+WHATIF_MIN_SAMPLES = 2_000
+WHATIF_RESIMULATIONS = 10_000
+# First spawn_key word of what-if re-simulation streams; chunk streams use their chunk
+# index there, which never gets this high, so re-simulations never reuse a chunk's numbers
+WHATIF_SPAWN_TAG = 2 ** 32 - 1
+# Partial scenarios kept per match by the most-likely-scenario beam search
+SCENARIO_BEAM_WIDTH = 2_048
 
-# Head-to-head records (historical data - can be updated)
+# Head-to-head records (historical data - can be updated). Default for Engine(); each
+# engine keeps its own copy, so changing this later does not affect existing engines
 head_to_head_advantage = {
     "CSK": {"MI": 0.45, "RCB": 0.65},  # CSK historically struggles against MI but dominates RCB
     "MI": {"CSK": 0.55, "SRH": 0.60},
@@ -38,7 +59,7 @@ head_to_head_advantage = {
     "LSG": {"GT": 0.50, "RR": 0.55}
 }
 
-# Precomputed NRR changes for faster calculation
+# Precomputed NRR changes for faster calculation (default for Engine(), copied like above)
 NRR_CHANGES = {
     'low': 0.03,
     'medium': 0.05,
@@ -46,59 +67,162 @@ NRR_CHANGES = {
     'dominant': 0.12
 }
 
+# Share of matches whose NRR swing is 10% larger (default for Engine())
+NRR_JITTER = 0.2
+
+
 # Enhanced NRR model based on match context - Optimized version
-def calculate_nrr_change(team_a, team_b, winner, T):
+# Kept for backward compatibility with callers of the original function; the package uses Engine.nrr_change
+def calculate_nrr_change(team_a, team_b, winner, T, rng=None):
     """Calculate a more realistic NRR change based on team strengths and match context - optimized"""
-    # Get teams' current points
-    points_a = T[team_a][0]
-    points_b = T[team_b][0]
-    
-    # Points difference to determine match type
-    points_diff = abs(points_a - points_b)
-    
-    # Use precomputed values instead of complex calculations
-    if points_diff >= 8:  # Big gap in points
-        nrr_change = NRR_CHANGES['high']
-    elif points_diff >= 4:  # Medium gap
-        nrr_change = NRR_CHANGES['medium']
-    else:  # Close match
-        nrr_change = NRR_CHANGES['low']
-    
-    # Add small randomness (reduced computation)
-    if random.random() > 0.8:  # Only 20% of the time add randomness
-        nrr_change *= 1.1
-    
-    return nrr_change
+    return DEFAULT_ENGINE.nrr_change(team_a, team_b, T, rng)
 
 
-def calculate_team_form(team):
-    """Calculate team form based on recent match results (wins/losses)"""
-    if not recent_results[team]:  # If no recent matches, return default form
-        return 0.5
-    
-    # Calculate form based on win/loss ratio in recent matches
-    wins = sum(1 for result in recent_results[team] if result == 'W')
-    form_value = wins / len(recent_results[team])
-    
-    # Scale to range 0.1 to 1.0
-    return max(0.1, min(1.0, 0.1 + 0.9 * form_value))
+class FormTracker:
+    """Recent results and form of every team for one walk through a schedule.
 
+    Each run creates its own tracker, so concurrent runs never see each other's form.
+    """
 
-def update_team_form(winner, loser):
-    """Update team form based on match results by recording recent match outcomes"""
-    # Record match results
-    recent_results[winner].append('W')  # Winner gets a Win
-    recent_results[loser].append('L')   # Loser gets a Loss
-    
-    # Recalculate form values based on recent results
-    team_form[winner] = calculate_team_form(winner)
-    team_form[loser] = calculate_team_form(loser)
+    def __init__(self, teams, window=RECENT_MATCHES_WINDOW):
+        self.recent_results = {team: deque(maxlen=window) for team in teams}
+        self.team_form = {team: 0.5 for team in teams}
+
+    def calculate_team_form(self, team):
+        """Calculate team form based on recent match results (wins/losses)"""
+        if not self.recent_results[team]:  # If no recent matches, return default form
+            return 0.5
+
+        # Calculate form based on win/loss ratio in recent matches
+        wins = sum(1 for result in self.recent_results[team] if result == 'W')
+        form_value = wins / len(self.recent_results[team])
+
+        # Scale to range 0.1 to 1.0
+        return max(0.1, min(1.0, 0.1 + 0.9 * form_value))
+
+    def update_team_form(self, winner, loser):
+        """Update team form based on match results by recording recent match outcomes"""
+        # Record match results
+        self.recent_results[winner].append('W')  # Winner gets a Win
+        self.recent_results[loser].append('L')   # Loser gets a Loss
+
+        # Recalculate form values based on recent results
+        self.team_form[winner] = self.calculate_team_form(winner)
+        self.team_form[loser] = self.calculate_team_form(loser)
+
+    def save(self, winner, loser):
+        """Everything update_team_form(winner, loser) touches, for restore()"""
+        return (winner, loser, list(self.recent_results[winner]), list(self.recent_results[loser]),
+                self.team_form[winner], self.team_form[loser])
+
+    def restore(self, saved):
+        winner, loser, winner_results, loser_results, winner_form, loser_form = saved
+        self.recent_results[winner].clear()
+        self.recent_results[winner].extend(winner_results)
+        self.recent_results[loser].clear()
+        self.recent_results[loser].extend(loser_results)
+        self.team_form[winner], self.team_form[loser] = winner_form, loser_form
+
+
+class RecentFormBuffer:
+    """Vectorized recent-form tracker: one ring buffer of results per sample and team.
+
+    Mirrors FormTracker (last RECENT_MATCHES_WINDOW results, 0.5 before a team has
+    played) for every Monte Carlo sample at once.
+    """
+
+    def __init__(self, samples, num_teams, window=RECENT_MATCHES_WINDOW):
+        self.window = window
+        # 1 = win, 0 = loss; slot for a team's next result is played % window
+        self.results = np.zeros((samples, num_teams, window), dtype=np.int8)
+        # Every sample plays the same schedule, so matches played is per team only
+        self.played = np.zeros(num_teams, dtype=np.int64)
+        self.forms = np.full((samples, num_teams), 0.5, dtype=np.float32)
+
+    def record(self, a, b, a_wins):
+        """Record match a vs b for all samples (a_wins is a boolean mask) and refresh form"""
+        self.results[:, a, self.played[a] % self.window] = a_wins
+        self.results[:, b, self.played[b] % self.window] = ~a_wins
+        self.played[a] += 1
+        self.played[b] += 1
+        self.forms[:, a] = self._form(a)
+        self.forms[:, b] = self._form(b)
+
+    @classmethod
+    def from_tracker(cls, tracker, teams, window=RECENT_MATCHES_WINDOW):
+        """Single-row buffer seeded from a FormTracker's recent results"""
+        form = cls(1, len(teams), window)
+        for i, t in enumerate(teams):
+            history = tracker.recent_results[t]
+            form.results[0, i, :len(history)] = [result == 'W' for result in history]
+            form.played[i] = len(history)
+            form.forms[0, i] = tracker.team_form[t]
+        return form
+
+    def expand(self, repeats=2):
+        """Repeat every sample row in place (copies of a row stay adjacent)"""
+        self.results = np.repeat(self.results, repeats, axis=0)
+        self.forms = np.repeat(self.forms, repeats, axis=0)
+
+    def take(self, rows):
+        """Keep only the given sample rows, in the given order"""
+        self.results = self.results[rows]
+        self.forms = self.forms[rows]
 
+    def _form(self, t):
+        n = min(int(self.played[t]), self.window)
+        if n == 0:
+            return 0.5
+        wins = self.results[:, t, :n].sum(axis=1, dtype=np.float32)
+        return np.clip(0.1 + 0.9 * wins / n, 0.1, 1.0)
 
-def IPL(team):
-    T = get_points_table()
-    matches_done = matches_played()
-    S = get_ipl_schedule()[matches_done:]
+
+class OutcomeBits:
+    """Match results of many samples packed 64 to a little-endian uint64 word.
+
+    Bit m % 64 of words[s, m // 64] is 1 when the first team of match m won in sample s:
+    one bit per result instead of a bool byte. Single columns are read with shifts and
+    masks; rows() unpacks just the rows asked for.
+    """
+
+    def __init__(self, samples, num_matches, words=None):
+        self.num_matches = num_matches
+        if words is None:
+            words = np.zeros((samples, (num_matches + 63) // 64), dtype='<u8')
+        self.words = words
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    def set(self, m_idx, a_wins):
+        """Store match m_idx's result for every sample (a_wins is a boolean mask)"""
+        self.words[:, m_idx >> 6] |= a_wins.astype(np.uint64) << np.uint64(m_idx & 63)
+
+    def column(self, m_idx):
+        """Boolean mask of the samples in which match m_idx's first team won"""
+        return ((self.words[:, m_idx >> 6] >> np.uint64(m_idx & 63)) & np.uint64(1)).astype(bool)
+
+    def rows(self, rows=slice(None)):
+        """Unpacked (rows, num_matches) boolean results of the given sample rows"""
+        words = self.words[rows]
+        return np.unpackbits(words.view(np.uint8), axis=-1, count=self.num_matches, bitorder='little').view(bool)
+
+    def __getitem__(self, rows):
+        return OutcomeBits(None, self.num_matches, self.words[rows])
+
+    def __setitem__(self, rows, other):
+        self.words[rows] = other.words
+
+
+def IPL(team, season=None):
+    if season is None:
+        season = fetch_season()
+    T = {t: pts for t, pts, _ in season.table}
+    S = season.remaining_schedule()
     op, ot = [], []
     j = 0
     while j < 10 ** 4:
@@ -118,272 +242,864 @@ def IPL(team):
     return 100 * len(op) / j
 
 
-def AllTeams():
-    matches_done = matches_played()
+def AllTeams(simulations=100_000, workers=1, seed=None, season=None):
+    """Playoff (top 4) percentage for every team, from at most one simulation pass"""
+    if season is None:
+        season = fetch_season()
+    teams, points, _, fixtures = season_arrays(season)
     probabilities = {}
-    for i in get_points_table().keys():
-        probabilities[i] = IPL(i)
+    outlook = None
+    for i in teams:
+        # Teams already through or out on points alone need no simulation
+        status = _clinch_status(i, teams, points, fixtures, 4)
+        if status is not None:
+            probabilities[i] = 100.0 if status == CLINCHED else 0.0
+            continue
+        if outlook is None:
+            outlook = SimulateSeason(season, simulations=simulations, workers=workers, seed=seed)
+        probabilities[i] = outlook.probability(i, 4)
     return probabilities
 
 
-def MyTeam(team, T, matches_done, S, for_position, simulations=100_000):
-    def calculate_strength(team_data, team_name):
-        """Calculate team strength based on points, NRR and recent form - simplified for speed"""
+class Engine:
+    """The match model (weights, head-to-head table, NRR swings, form window) and its runs.
+
+    An engine only holds configuration: every run builds its own table, form and random
+    streams, so one engine (or several with different models) can serve any number of
+    threads at once, and a seeded run gives the same result whatever else is running.
+    The module-level functions (SimulateSeason, MyTeam, ...) use DEFAULT_ENGINE.
+
+    backend picks how Monte Carlo chunks play their matches: 'numpy' (one match for all
+    samples at a time), 'numba' (the compiled per-sample kernel in kernels.py) or 'python'
+    (that kernel uncompiled, for checking it). Every backend draws the same random numbers,
+    so results agree for a seed. The default is numba when importable, else numpy
+    (RCBINATOR_KERNEL overrides).
+
+    nrr_jitter is the share of matches whose NRR swing is 10% larger. Monte Carlo draws it
+    per sample and match; exact enumeration applies the mean swing to every result.
+    """
+
+    def __init__(self, form_weight=FORM_WEIGHT, points_weight=POINTS_WEIGHT, nrr_weight=NRR_WEIGHT,
+                 head_to_head=None, nrr_changes=None, form_window=RECENT_MATCHES_WINDOW, backend=None,
+                 nrr_jitter=NRR_JITTER):
+        self.form_weight = form_weight
+        self.points_weight = points_weight
+        self.nrr_weight = nrr_weight
+        self.head_to_head = copy.deepcopy(head_to_head_advantage if head_to_head is None else head_to_head)
+        self.nrr_changes = dict(NRR_CHANGES if nrr_changes is None else nrr_changes)
+        self.form_window = form_window
+        self.nrr_jitter = nrr_jitter
+        # Monte Carlo match loop: numpy, or the per-sample kernel (numba when installed)
+        self.backend = kernels.check_backend(backend or kernels.default_backend())
+
+    def nrr_change(self, team_a, team_b, T, rng=None, expected=False):
+        """NRR swing for team_a vs team_b from the points gap, 10% larger nrr_jitter of the time.
+
+        expected=True gives the mean swing instead of a random draw.
+        """
+        # Points difference to determine match type
+        points_diff = abs(T[team_a][0] - T[team_b][0])
+
+        # Use precomputed values instead of complex calculations
+        if points_diff >= 8:  # Big gap in points
+            nrr_change = self.nrr_changes['high']
+        elif points_diff >= 4:  # Medium gap
+            nrr_change = self.nrr_changes['medium']
+        else:  # Close match
+            nrr_change = self.nrr_changes['low']
+
+        if expected:
+            return nrr_change * self.expected_jitter
+
+        # Add small randomness (reduced computation)
+        draw = rng.random() if rng is not None else random.random()
+        if draw > 1 - self.nrr_jitter:  # Only nrr_jitter of the time add randomness
+            nrr_change *= 1.1
+
+        return nrr_change
+
+    @property
+    def expected_jitter(self):
+        """Mean multiplier of the NRR swing"""
+        return 1 + 0.1 * self.nrr_jitter
+
+    def strength(self, team_data, current_form):
         points, nrr = team_data
-        # Simple calculation for better performance
         normalized_points = points / 28  # Normalize to 0-1 (max 28 points possible)
         normalized_nrr = (nrr + 1.5) / 3  # Normalize to 0-1 (simplified range)
-        
-        # Get current form value based on recent matches
-        current_form = team_form[team_name]
-        
-        # Fast calculation with fewer operations
-        strength = (POINTS_WEIGHT * normalized_points) + (NRR_WEIGHT * normalized_nrr) + (FORM_WEIGHT * current_form)
+
+        strength = (self.points_weight * normalized_points) + (self.nrr_weight * normalized_nrr) + \
+                   (self.form_weight * current_form)
         return max(0.1, min(1.0, strength))  # Clamp between 0.1 and 1.0
 
-    def get_team_position(table, team_name):
-        sorted_teams = sorted(table.values(), key=lambda x: (-x[0], -x[1]))
-        for pos, t in enumerate(sorted_teams, 1):
-            if (t[0], t[1]) == (table[team_name][0], table[team_name][1]):
-                return pos
-        return len(sorted_teams)
-    
-    # Reset recent results and form at the start of simulation
-    for t in team_form:
-        recent_results[t].clear()
-        team_form[t] = 0.5
-    
-    no_remaining = len(S)
+    def match_probability(self, team_a, team_b, T, form):
+        strength_a = self.strength(T[team_a], form.team_form[team_a])
+        strength_b = self.strength(T[team_b], form.team_form[team_b])
 
-    if no_remaining == 0:
-        pos = get_team_position(T, team)
-        return (100.0 if pos <= for_position else 0.0, [], [])
-
-    # Precompute match probabilities with enhanced model
-    match_probs = []
-    for match in S:
-        team_a, team_b = match
-        strength_a = calculate_strength(T[team_a], team_a)
-        strength_b = calculate_strength(T[team_b], team_b)
-        
         # Base probability from team strengths
         base_prob_a = strength_a / (strength_a + strength_b)
-        
-        # Apply head-to-head advantage if available
-        h2h_modifier = 0
-        if team_a in head_to_head_advantage and team_b in head_to_head_advantage[team_a]:
-            h2h_modifier = head_to_head_advantage[team_a][team_b] - 0.5  # Convert from win% to advantage
-        
-        # Final probability
-        prob_a = base_prob_a + h2h_modifier
+
         # Ensure probability is between 0.1 and 0.9 (no sure things in cricket)
-        prob_a = max(0.1, min(0.9, prob_a))
-        
-        match_probs.append(prob_a)
-
-    # Exhaustive search for <18 matches (weighted) - reduced from 22 for speed
-    if no_remaining < 18:
-        total_outcomes = 1 << no_remaining
-        success = 0.0
-        example_out = None
-        example_tab = None
-
-        for outcome in range(total_outcomes):
-            # Reset form for each complete tournament scenario
-            for t in team_form:
-                recent_results[t].clear()
-                team_form[t] = 0.5
-                
-            temp_T = copy.deepcopy(T)
-            scenario = []
-            scenario_prob = 1.0  # Track probability of this outcome
-            
-            for match_idx in range(no_remaining):
-                team_a, team_b = S[match_idx]
-                bit_pos = no_remaining - 1 - match_idx
-                result = (outcome >> bit_pos) & 1
-                
-                # Recalculate match probability using current form values
-                strength_a = calculate_strength(temp_T[team_a], team_a)
-                strength_b = calculate_strength(temp_T[team_b], team_b)
-                base_prob_a = strength_a / (strength_a + strength_b)
-                
-                # Apply head-to-head adjustment
-                h2h_modifier = 0
-                if team_a in head_to_head_advantage and team_b in head_to_head_advantage[team_a]:
-                    h2h_modifier = head_to_head_advantage[team_a][team_b] - 0.5
-                
-                match_prob = max(0.1, min(0.9, base_prob_a + h2h_modifier))
-                
-                # Update probability for this outcome
-                if result == 0:
-                    scenario_prob *= match_prob
-                    winner = team_a
-                    loser = team_b
-                else:
-                    scenario_prob *= (1 - match_prob)
-                    winner = team_b
-                    loser = team_a
-                
-                # Calculate dynamic NRR change (optimized)
-                nrr_change = calculate_nrr_change(team_a, team_b, winner, temp_T)
-                
-                # Update table
-                temp_T[winner][0] += 2
-                temp_T[winner][1] += nrr_change
-                temp_T[loser][1] -= nrr_change
-                scenario.append(((team_a, team_b), winner))
-                
-                # Update team form based on this match result
-                update_team_form(winner, loser)
-
-            # Check qualification
-            sorted_teams = sorted(temp_T.values(), key=lambda x: (-x[0], -x[1]))
-            cutoff = sorted_teams[for_position-1] if len(sorted_teams) >= for_position else (0, 0)
-            team_entry = temp_T[team]
-            
-            if (team_entry[0] > cutoff[0]) or (team_entry[0] == cutoff[0] and team_entry[1] >= cutoff[1]):
-                success += scenario_prob
-                if not example_out:
-                    example_out = scenario
-                    example_tab = dict(sorted(temp_T.items(), key=lambda x: (-x[1][0], -x[1][1])))
-
-        return (success * 100, example_out, example_tab)
-
-    # Monte Carlo for ≥18 matches - optimized version
+        return max(0.1, min(0.9, base_prob_a + self.head_to_head_modifier(team_a, team_b)))
+
+    def head_to_head_modifier(self, team_a, team_b):
+        if team_a in self.head_to_head and team_b in self.head_to_head[team_a]:
+            return self.head_to_head[team_a][team_b] - 0.5  # Convert from win% to advantage
+        return 0
+
+    def win_probability(self, pts, nr, form, a, b, h2h):
+        """Vectorized match_probability: P(team a beats team b) for every row"""
+        strength = (self.points_weight * pts[:, [a, b]] / 28 + self.nrr_weight * (nr[:, [a, b]] + 1.5) / 3
+                    + self.form_weight * form.forms[:, [a, b]])
+        strength = np.clip(strength, 0.1, 1.0)
+        return np.clip(strength[:, 0] / strength.sum(axis=1) + h2h, 0.1, 0.9)
+
+    def apply_results(self, pts, nr, form, a, b, a_wins, rng=None):
+        """Vectorized nrr_change plus table and form update for every row (rng None: mean swing)"""
+        # NRR swing depends on the points gap before the match
+        points_diff = np.abs(pts[:, a] - pts[:, b])
+        nrr_change = np.where(points_diff >= 8, self.nrr_changes['high'],
+                              np.where(points_diff >= 4, self.nrr_changes['medium'], self.nrr_changes['low']))
+        if rng is None:
+            nrr_change = nrr_change * self.expected_jitter
+        else:
+            nrr_change = np.where(rng.random(len(a_wins)) > 1 - self.nrr_jitter, nrr_change * 1.1, nrr_change)
+        signed_change = np.where(a_wins, nrr_change, -nrr_change)
+
+        pts[a_wins, a] += 2
+        pts[~a_wins, b] += 2
+        nr[:, a] += signed_change
+        nr[:, b] -= signed_change
+        form.record(a, b, a_wins)
+
+    def form_buffer(self, samples, num_teams):
+        return RecentFormBuffer(samples, num_teams, self.form_window)
+
+    def simulate_season(self, T, matches_done=None, S=None, simulations=100_000, **kwargs):
+        """SimulateSeason() with this engine's model"""
+        return SimulateSeason(T, matches_done, S, simulations, engine=self, **kwargs)
+
+    def simulate_samples(self, T, matches_done=None, S=None, simulations=100_000, **kwargs):
+        """SimulateSamples() with this engine's model"""
+        return SimulateSamples(T, matches_done, S, simulations, engine=self, **kwargs)
+
+    def my_team(self, team, T, matches_done=None, S=None, for_position=4, simulations=100_000, **kwargs):
+        """MyTeam() with this engine's model"""
+        return MyTeam(team, T, matches_done, S, for_position, simulations, engine=self, **kwargs)
+
+    def most_likely_scenarios(self, team, T, S=None, for_position=4, **kwargs):
+        """MostLikelyScenarios() with this engine's model"""
+        return MostLikelyScenarios(team, T, S, for_position, engine=self, **kwargs)
+
+
+DEFAULT_ENGINE = Engine()
+
+
+class SeasonOutlook:
+    """Finishing-position distribution for every team from a single simulation pass.
+
+    matrix[i, k] is the probability that teams[i] finishes in position k + 1.
+    """
+
+    def __init__(self, teams, matrix, examples, samples, exact):
+        self.teams = teams
+        self.matrix = matrix
+        self.samples = samples  # Outcomes evaluated (2^n when exact)
+        self.exact = exact
+        self.chunk_stats = []  # Per-chunk samples, seconds and bytes (Monte Carlo only)
+        # Mean squared importance weight per cell (importance sampling only)
+        self.sq_matrix = None
+        # (team, for_position) -> (example_out, example_tab)
+        self._examples = examples
+
+    def probability(self, team, for_position):
+        """Percentage chance that team finishes in the top for_position"""
+        row = self.matrix[self.teams.index(team)]
+        return float(min(100.0, row[:for_position].sum() * 100))
+
+    def example(self, team, for_position):
+        """First simulated scenario in which team finishes in the top for_position"""
+        return self._examples.get((team, for_position), (None, None))
+
+    def standard_error(self, team, for_position):
+        """Standard error (in %) of probability(team, for_position)"""
+        if self.exact:
+            return 0.0
+        p = self.matrix[self.teams.index(team), :for_position].sum()
+        if self.sq_matrix is None:
+            second_moment = p
+        else:
+            second_moment = self.sq_matrix[self.teams.index(team), :for_position].sum()
+        return float(math.sqrt(max(0.0, second_moment - p * p) / self.samples) * 100)
+
+    def interval(self, team, for_position, confidence=0.95):
+        """Confidence interval (in %) for probability(team, for_position).
+
+        Wilson score interval for plain sampling, normal interval for importance sampling.
+        """
+        p = self.probability(team, for_position)
+        if self.exact:
+            return (p, p)
+        if self.sq_matrix is not None:
+            half = NormalDist().inv_cdf((1 + confidence) / 2) * self.standard_error(team, for_position)
+            return (max(0.0, p - half), min(100.0, p + half))
+        successes = round(p / 100 * self.samples)
+        low, high = wilson_interval(successes, self.samples, confidence)
+        return (low * 100, high * 100)
+
+
+def wilson_interval(successes, n, confidence=0.95):
+    """Wilson score interval for a binomial proportion"""
+    if n == 0:
+        return (0.0, 1.0)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+def season_inputs(T, matches_done=None, S=None):
+    """(T, matches_done, S) as dicts and lists; T may be a SeasonState, which supplies all three"""
+    if isinstance(T, SeasonState):
+        return T.points_table(), T.matches_done, T.remaining_schedule()
+    return T, matches_done, S
+
+
+def season_arrays(T, matches_done=None, S=None):
+    """(teams, points, nrr, fixtures) for the array-based runs.
+
+    points and nrr are float64 per team and fixtures the remaining matches as (i, j) team
+    indices. A SeasonState supplies them from its arrays; a {team: [points, nrr]} table
+    and named schedule are converted.
+    """
+    if isinstance(T, SeasonState):
+        return list(T.teams), T.points.astype(np.float64), T.nrr_values(), T.remaining_fixtures().tolist()
+    teams = list(T.keys())
+    team_idx = {t: i for i, t in enumerate(teams)}
+    points = np.array([T[t][0] for t in teams], dtype=np.float64)
+    nrr = np.array([T[t][1] for t in teams], dtype=np.float64)
+    return teams, points, nrr, [(team_idx[a], team_idx[b]) for a, b in S]
+
+
+def _clinch_status(team, teams, points, fixtures, for_position):
+    """clinch_status() with teams identified by index, straight from season_arrays()"""
+    table = {i: (int(pts),) for i, pts in enumerate(points.tolist())}
+    return clinch_status(teams.index(team), table, fixtures, for_position)
+
+
+def SimulateSeason(T, matches_done=None, S=None, simulations=100_000, progress=None, workers=1, seed=None,
+                   chunk_size=MC_CHUNK_SIZE, stop=None, exact=None, target=None, tilt=0.0, engine=None):
+    """Simulate the remaining schedule once and return a SeasonOutlook for all teams.
+
+    T is the {team: [points, nrr]} table and S the remaining fixtures, or T is a
+    SeasonState and matches_done and S are taken from it (as in every entry point below).
+
+    Monte Carlo runs are streamed in chunks of chunk_size samples; progress, if given,
+    is called with each chunk's stats (samples done, seconds, bytes held by the chunk).
+    stop, if given, is called as stop(counts, samples_done) after every chunk, where
+    counts[i, k] is how often team i finished in position k + 1; returning True ends
+    the run early. exact forces exact enumeration (True) or Monte Carlo (False); by default
+    schedules of up to EXACT_MATCH_LIMIT matches are enumerated exactly.
+    With workers > 1 the chunks are spread over a process pool. Every chunk draws from
+    its own Generator spawned from SeedSequence(seed), so a given seed gives identical
+    results for any number of workers.
+
+    With target and tilt > 0, Monte Carlo uses importance sampling: every match is drawn
+    with its log-odds shifted by tilt towards the result that helps target climb (target
+    wins; otherwise the side with fewer points wins), and each sample is reweighted by its
+    likelihood ratio. The matrix stays unbiased and outlook.standard_error() accounts for
+    the weights.
+
+    engine supplies the match model (DEFAULT_ENGINE if None); the run shares no state with
+    any other run, so concurrent calls from several threads are safe.
+    """
+    engine = engine or DEFAULT_ENGINE
+    teams, points, nrr, fixtures = season_arrays(T, matches_done, S)
+    seed_seq = np.random.SeedSequence(seed)
+
+    team_idx = {t: i for i, t in enumerate(teams)}
+    num_teams = len(teams)
+    no_remaining = len(fixtures)
+    matrix = np.zeros((num_teams, num_teams))
+    examples = {}
+
+    if no_remaining == 0:
+        order = sorted(range(num_teams), key=lambda i: (-points[i], -nrr[i]))
+        for pos, i in enumerate(order):
+            matrix[i, pos] = 1.0
+        examples = {(t, k): ([], []) for t in teams for k in range(1, num_teams + 1)}
+        return SeasonOutlook(teams, matrix, examples, 1, True)
+
+    if exact is None:
+        exact = no_remaining <= EXACT_MATCH_LIMIT
+
+    # Exact enumeration of every outcome (weighted) for up to EXACT_MATCH_LIMIT matches
+    if exact:
+        # The tree walk applies and undoes results on a {team: [points, nrr]} table
+        T, _, S = season_inputs(T, matches_done, S)
+        _enumerate_exact(engine, T, S, teams, matrix, examples)
+        return SeasonOutlook(teams, matrix, examples, 1 << no_remaining, True)
+
+    # Monte Carlo beyond EXACT_MATCH_LIMIT matches, streamed in fixed-size chunks.
+    # Same model as the exact branch: every sample re-evaluates each match from its own
+    # points, NRR and form as it evolves.
+    else:
+        matches = [(a, b, engine.head_to_head_modifier(teams[a], teams[b])) for a, b in fixtures]
+
+        # Only position counts and example outcome rows survive between chunks,
+        # so peak memory depends on chunk_size, not on the requested sample count
+        counts = np.zeros((num_teams, num_teams))
+        sq_counts = np.zeros((num_teams, num_teams))
+        best_pos = [num_teams + 1] * num_teams
+        example_rows = {}
+        chunk_stats = []
+        done = 0
+
+        # One independent stream per chunk
+        chunk_sizes = [min(chunk_size, simulations - start) for start in range(0, simulations, chunk_size)]
+        streams = seed_seq.spawn(len(chunk_sizes))
+        target_i = team_idx[target] if target is not None and tilt else None
+        jobs = [(engine, points, nrr, matches, size, stream, target_i, tilt)
+                for size, stream in zip(chunk_sizes, streams)]
+
+        executor = None
+        if workers > 1 and len(jobs) > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+            results = executor.map(_run_chunk, jobs)
+        else:
+            results = map(_run_chunk, jobs)
+
+        try:
+            # Results arrive in chunk order, so merging is independent of the worker count
+            for chunk_counts, chunk_sq_counts, first_hit, rows, stats in results:
+                counts += chunk_counts
+                sq_counts += chunk_sq_counts
+                _record_examples(first_hit, best_pos, teams, example_rows, rows.__getitem__)
+
+                done += stats['samples']
+                stats.update(chunk=len(chunk_stats), samples_done=done, samples_total=simulations)
+                chunk_stats.append(stats)
+                if progress is not None:
+                    progress(stats)
+                if stop is not None and stop(counts, done):
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        built = {}
+        S = [(teams[a], teams[b]) for a, b in fixtures]
+        for key, (a_won, pts_row, nr_row) in example_rows.items():
+            if id(a_won) not in built:
+                built[id(a_won)] = _build_example([], S, a_won, pts_row, nr_row, teams)
+            examples[key] = built[id(a_won)]
+
+        outlook = SeasonOutlook(teams, counts / done, examples, done, False)
+        outlook.chunk_stats = chunk_stats
+        if target_i is not None:
+            outlook.sq_matrix = sq_counts / done
+        return outlook
+
+
+def _run_chunk(job):
+    """Simulate one Monte Carlo chunk and reduce it to counts (runs in pool workers too)"""
+    engine, points, nrr, matches, samples, stream, target_i, tilt = job
+    start = time.perf_counter()
+    rng = np.random.default_rng(stream)
+    outcomes, pt, nr, positions, log_weight, chunk_bytes = _simulate_chunk(
+        engine, points, nrr, matches, samples, rng, target_i, tilt)
+
+    num_teams = len(points)
+    weight = None if log_weight is None else np.exp(log_weight)
+    counts = np.stack([np.bincount(positions[:, i], weights=weight, minlength=num_teams)
+                       for i in range(num_teams)])
+    if weight is None:
+        sq_counts = counts
+    else:
+        sq_counts = np.stack([np.bincount(positions[:, i], weights=weight * weight, minlength=num_teams)
+                              for i in range(num_teams)])
+    first_hit = _first_hits(positions)
+    rows = {int(idx): (outcomes.rows(idx), pt[idx].copy(), nr[idx].copy())
+            for idx in np.unique(first_hit[first_hit >= 0])}
+    stats = {
+        'samples': samples,
+        'seconds': time.perf_counter() - start,
+        'bytes': chunk_bytes,
+    }
+    return counts, sq_counts, first_hit, rows, stats
+
+
+def _simulate_chunk(engine, points, nrr, matches, samples, rng, target_i=None, tilt=0.0,
+                    forced=None, probabilities=None):
+    """Simulate one chunk of Monte Carlo seasons.
+
+    Returns the packed outcomes (OutcomeBits, True = team_a won), final points and NRR, the 0-based
+    finishing position of every team in every sample, per-sample log importance weights
+    (None unless tilting towards target_i) and the bytes held by the chunk's working arrays.
+    forced maps match indices to a fixed result (True = team_a wins) that is applied
+    instead of drawn. If probabilities (samples x matches) is given, it receives every
+    sample's P(team_a wins) for every match.
+    """
+    num_teams = len(points)
+    
+    # Per-sample, per-team ring buffer of recent results (same semantics as FormTracker)
+    form = engine.form_buffer(samples, num_teams)
+    outcomes = OutcomeBits(samples, len(matches))
+
+    pt = np.tile(points, (samples, 1))
+    nr = np.tile(nrr, (samples, 1))
+    log_weight = np.zeros(samples) if target_i is not None else None
+
+    if engine.backend == 'numpy':
+        for m_idx, (a, b, h2h) in enumerate(matches):
+            # Match probability from each sample's own table and form at this point
+            prob_a = engine.win_probability(pt, nr, form, a, b, h2h)
+            if probabilities is not None:
+                probabilities[:, m_idx] = prob_a
+            if forced is not None and m_idx in forced:
+                a_wins = np.full(samples, forced[m_idx])
+            elif log_weight is None:
+                a_wins = rng.random(samples) < prob_a
+            else:
+                # Draw from the tilted proposal and keep the likelihood ratio
+                proposal_a = _tilted_probability(pt, prob_a, a, b, target_i, tilt)
+                a_wins = rng.random(samples) < proposal_a
+                log_weight += np.where(a_wins, np.log(prob_a / proposal_a),
+                                       np.log((1 - prob_a) / (1 - proposal_a)))
+            outcomes.set(m_idx, a_wins)
+            engine.apply_results(pt, nr, form, a, b, a_wins, rng)
+    else:
+        # Per-sample compiled kernel, same draws as the loop above
+        kernels.play_matches(engine, pt, nr, form, outcomes, matches, rng, target_i, tilt,
+                             forced, probabilities, log_weight)
+
+    # Calculate rankings with weighted points/NRR (points dominate)
+    composite = pt * 1000 + nr  # Points dominate by 1000:1 ratio
+    rankings = np.argsort(-composite, axis=1, kind='stable')
+    # positions[s, i] = 0-based finishing position of team i in sample s
+    positions = np.empty_like(rankings)
+    np.put_along_axis(positions, rankings, np.arange(num_teams), axis=1)
+
+    chunk_bytes = sum(x.nbytes for x in (outcomes.words, pt, nr, form.results, form.forms,
+                                         composite, rankings, positions))
+    return outcomes, pt, nr, positions, log_weight, chunk_bytes
+
+
+def _tilted_probability(pts, prob_a, a, b, target_i, tilt):
+    """Importance-sampling proposal: shift the log-odds of team a winning by +/- tilt.
+
+    Towards target_i winning its own matches; elsewhere towards the side with fewer
+    points (a leader dropping points helps target climb). Equal points are left alone.
+    """
+    if a == target_i:
+        direction = 1.0
+    elif b == target_i:
+        direction = -1.0
     else:
-        teams = list(T.keys())
-        team_idx = {t: i for i, t in enumerate(teams)}
-        target_i = team_idx[team]
-        matches = [(team_idx[m[0]], team_idx[m[1]]) for m in S]
-        num_matches = len(matches)
-
-        points = np.array([T[t][0] for t in teams], dtype=np.float32)
-        nrr = np.array([T[t][1] for t in teams], dtype=np.float32)
-        
-        # Use optimized number of samples
-        samples = min(simulations, 100_000)  # Cap samples for performance
-        
-        # Create arrays to track form and results for each team in each simulation
-        team_forms = np.full((samples, len(teams)), 0.5, dtype=np.float32)
-        
-        # We'll use a different approach for Monte Carlo to track recent results
-        # Instead of deques, we'll use a sliding window approach with fixed arrays
-        # This is more efficient for vectorized operations
-        
-        # Array to store the outcomes for later form calculation
-        match_winners = np.zeros((samples, num_matches), dtype=np.int32)
-
-        # Generate outcomes using precomputed probabilities initially
-        outcomes = np.random.binomial(1, match_probs, size=(samples, num_matches))
-
-        pt = np.tile(points, (samples, 1))
-        pt[pt > 22] = 22  # Cap points
-        nr = np.tile(nrr, (samples, 1))
-
-        # Process matches in batches for better performance
-        for m_idx, (a, b) in enumerate(matches):
-            team_a = teams[a]
-            team_b = teams[b]
-            
-            # Recalculate match probabilities based on current form
-            # We'll simplify this for performance, using the precomputed probabilities
-            # In a more accurate model, we would recalculate for each sample
-            
-            a_wins = outcomes[:, m_idx].astype(bool)
-            b_wins = ~a_wins
-            
-            # Update points
-            pt[a_wins, a] += 2
-            pt[b_wins, b] += 2
-            
-            # Update NRR (simplified)
-            nr[a_wins, a] += 0.05
-            nr[a_wins, b] -= 0.05
-            nr[b_wins, b] += 0.05
-            nr[b_wins, a] -= 0.05
-            
-            # Record match winners for form calculation
-            match_winners[a_wins, m_idx] = a
-            match_winners[b_wins, m_idx] = b
-            
-            # Update form based on the last RECENT_MATCHES_WINDOW matches
-            if m_idx >= RECENT_MATCHES_WINDOW:
-                # Look back at the last few matches for each team
-                for sim in range(samples):
-                    for t_idx in range(len(teams)):
-                        # Count recent wins for this team
-                        recent_win_count = 0
-                        recent_match_count = 0
-                        
-                        # Check the last few matches involving this team
-                        for prev_m_idx in range(max(0, m_idx - RECENT_MATCHES_WINDOW), m_idx):
-                            prev_match = matches[prev_m_idx]
-                            if t_idx in prev_match:  # If this team played in this match
-                                recent_match_count += 1
-                                if match_winners[sim, prev_m_idx] == t_idx:  # If this team won
-                                    recent_win_count += 1
-                        
-                        # Update form if team played any recent matches
-                        if recent_match_count > 0:
-                            win_ratio = recent_win_count / recent_match_count
-                            team_forms[sim, t_idx] = max(0.1, min(1.0, 0.1 + 0.9 * win_ratio))
-
-        # Calculate rankings with weighted points/NRR (points dominate)
-        composite = pt * 1000 + nr  # Points dominate by 1000:1 ratio
-        rankings = np.argsort(-composite, axis=1)
-        positions = np.argmax(rankings == target_i, axis=1)
-        success_mask = positions < for_position
-        success_count = np.sum(success_mask)
-
-        # Example outcome
-        example_out, example_tab = None, None
-        if success_count > 0:
-            idx = np.where(success_mask)[0][0]
-            pt_ex = points.copy()
-            nr_ex = nrr.copy()
-            scenario = []
-            
-            # Reset form tracking for the example scenario
-            for t in team_form:
-                recent_results[t].clear()
-                team_form[t] = 0.5
-            
-            for m_idx, (a, b) in enumerate(matches):
-                result = outcomes[idx, m_idx]
-                team_a = teams[a]
-                team_b = teams[b]
-                
-                if result:
-                    winner = team_a
-                    loser = team_b
-                else:
-                    winner = team_b
-                    loser = team_a
-                
-                # Calculate a representative NRR change
-                nrr_change = calculate_nrr_change(team_a, team_b, winner, {
-                    team_a: (float(pt_ex[a]), float(nr_ex[a])),
-                    team_b: (float(pt_ex[b]), float(nr_ex[b]))
-                })
-                
-                scenario.append(((team_a, team_b), winner))
-                
-                if result:
-                    pt_ex[a] += 2
-                    nr_ex[a] += nrr_change
-                    nr_ex[b] -= nrr_change
-                else:
-                    pt_ex[b] += 2
-                    nr_ex[b] += nrr_change
-                    nr_ex[a] -= nrr_change
-                
-                # Update team form for next calculations
-                update_team_form(winner, loser)
-
-            sorted_t = sorted(zip(pt_ex, nr_ex, teams), 
-                            key=lambda x: (-x[0], -x[1]))
-            example_tab = {t: (float(p), float(n)) for p, n, t in sorted_t}
-            example_out = scenario
-
-        return (success_count / samples * 100, example_out, example_tab)
\ No newline at end of file
+        direction = np.sign(pts[:, b] - pts[:, a])
+    logit = np.log(prob_a / (1 - prob_a)) + tilt * direction
+    return 1 / (1 + np.exp(-logit))
+
+
+def _first_hits(positions):
+    """first_hit[i, k] = first row in which team i finishes in 0-based position k, or -1"""
+    num_teams = positions.shape[1]
+    first_hit = np.full((num_teams, num_teams), -1, dtype=np.int64)
+    for i in range(num_teams):
+        reached, first_row = np.unique(positions[:, i], return_index=True)
+        first_hit[i, reached] = first_row
+    return first_hit
+
+
+def _record_examples(first_hit, best_pos, teams, examples, make_example):
+    """Store an example for every (team, for_position) first reached in this block of rows.
+
+    best_pos holds each team's best 1-based position seen in earlier blocks; blocks are
+    merged in order, so the stored example is the first qualifying scenario overall.
+    """
+    for i, t in enumerate(teams):
+        first_idx = -1
+        example = None
+        for k in range(best_pos[i] - 1):
+            idx = int(first_hit[i, k])
+            if idx >= 0 and (first_idx < 0 or idx < first_idx):
+                first_idx = idx
+                example = make_example(idx)
+            if example is not None:
+                examples[(t, k + 1)] = example
+        reached = np.flatnonzero(first_hit[i] >= 0)
+        if len(reached):
+            best_pos[i] = min(best_pos[i], int(reached[0]) + 1)
+
+
+def _enumerate_exact(engine, T, S, teams, matrix, examples):
+    """Weight every outcome of S into matrix, walking the outcome tree depth-first.
+
+    Each match result is applied to one shared table and undone on the way back up,
+    so sibling scenarios share all prefix work. The last EXACT_VECTOR_DEPTH matches
+    below every prefix are expanded breadth-first with NumPy. Scenarios are visited
+    in the same order as counting through the outcome bits (team_a wins first).
+    Every result moves NRR by the expected swing, so the answer needs no random draws:
+    a draw per tree node would be shared by every scenario below it.
+    """
+    team_idx = {t: i for i, t in enumerate(teams)}
+    num_teams = len(teams)
+    split = max(0, len(S) - EXACT_VECTOR_DEPTH)
+    suffix = [(team_idx[a], team_idx[b], engine.head_to_head_modifier(a, b)) for a, b in S[split:]]
+    table = copy.deepcopy(T)
+    form = FormTracker(teams, engine.form_window)
+    scenario = []
+    # Best (lowest) position each team has reached in any scenario so far
+    best_pos = [num_teams + 1] * num_teams
+
+    def descend(match_idx, scenario_prob):
+        if match_idx == split:
+            _expand_suffix(engine, table, form, scenario, scenario_prob, S[split:], suffix, teams,
+                           matrix, examples, best_pos)
+            return
+
+        team_a, team_b = S[match_idx]
+        # Recalculate match probability using current form values
+        match_prob = engine.match_probability(team_a, team_b, table, form)
+
+        for winner, loser, prob in ((team_a, team_b, match_prob), (team_b, team_a, 1 - match_prob)):
+            # Save everything this result touches so it can be undone exactly
+            saved_table = (table[winner][0], table[winner][1], table[loser][1])
+            saved_form = form.save(winner, loser)
+
+            # Calculate dynamic NRR change (optimized)
+            nrr_change = engine.nrr_change(team_a, team_b, table, expected=True)
+            table[winner][0] += 2
+            table[winner][1] += nrr_change
+            table[loser][1] -= nrr_change
+            form.update_team_form(winner, loser)
+            scenario.append(((team_a, team_b), winner))
+
+            descend(match_idx + 1, scenario_prob * prob)
+
+            scenario.pop()
+            table[winner][0], table[winner][1], table[loser][1] = saved_table
+            form.restore(saved_form)
+
+    descend(0, 1.0)
+
+
+def _expand_suffix(engine, table, tracker, scenario, scenario_prob, suffix_S, suffix, teams,
+                   matrix, examples, best_pos):
+    """Enumerate every outcome of the suffix matches below one prefix with NumPy"""
+    num_teams = len(teams)
+    pts = np.array([[table[t][0] for t in teams]], dtype=np.float64)
+    nr = np.array([[table[t][1] for t in teams]], dtype=np.float64)
+    weight = np.array([scenario_prob])
+    form = RecentFormBuffer.from_tracker(tracker, teams, engine.form_window)
+
+    for a, b, h2h in suffix:
+        prob_a = engine.win_probability(pts, nr, form, a, b, h2h)
+
+        # Branch every row: even rows team_a wins, odd rows team_b wins
+        pts = np.repeat(pts, 2, axis=0)
+        nr = np.repeat(nr, 2, axis=0)
+        form.expand(2)
+        rows = pts.shape[0]
+        a_wins = np.tile([True, False], rows // 2)
+        prob_a = np.repeat(prob_a, 2)
+        weight = np.repeat(weight, 2) * np.where(a_wins, prob_a, 1 - prob_a)
+        engine.apply_results(pts, nr, form, a, b, a_wins)
+
+    # Final standings for every scenario below this prefix
+    composite = pts * 1000 + nr  # Points dominate by 1000:1 ratio
+    rankings = np.argsort(-composite, axis=1, kind='stable')
+    positions = np.empty_like(rankings)
+    np.put_along_axis(positions, rankings, np.arange(num_teams), axis=1)
+
+    for i in range(num_teams):
+        matrix[i] += np.bincount(positions[:, i], weights=weight, minlength=num_teams)
+    _record_examples(_first_hits(positions), best_pos, teams, examples,
+                     lambda row: _suffix_example(scenario, suffix_S, row, pts[row], nr[row], teams))
+
+
+def _suffix_example(scenario, suffix_S, row, pts_row, nr_row, teams):
+    """Scenario list and final table for one row of an expanded suffix"""
+    depth = len(suffix_S)
+    # Row index bits: first suffix match is the most significant, 0 = team_a wins
+    a_won = [not (row >> (depth - 1 - j)) & 1 for j in range(depth)]
+    return _build_example(scenario, suffix_S, a_won, pts_row, nr_row, teams)
+
+
+def _build_example(scenario, S, a_won, pts_row, nr_row, teams):
+    """Extend scenario with the results of S and pair it with the final table"""
+    full = list(scenario)
+    for (team_a, team_b), won in zip(S, a_won):
+        full.append(((team_a, team_b), team_a if won else team_b))
+    order = sorted(range(len(teams)), key=lambda i: (-pts_row[i], -nr_row[i]))
+    example_tab = {teams[i]: [int(pts_row[i]), float(nr_row[i])] for i in order}
+    return full, example_tab
+
+
+def MyTeam(team, T, matches_done=None, S=None, for_position=4, simulations=100_000, progress=None, workers=1,
+           seed=None, engine=None):
+    teams, points, _, fixtures = season_arrays(T, matches_done, S)
+    # Already through or out on points alone: no need to simulate
+    status = _clinch_status(team, teams, points, fixtures, for_position)
+    if status is not None:
+        return (100.0 if status == CLINCHED else 0.0, None, None)
+
+    outlook = SimulateSeason(T, matches_done, S, simulations, progress, workers, seed, engine=engine)
+    example_out, example_tab = outlook.example(team, for_position)
+    return (outlook.probability(team, for_position), example_out, example_tab)
+
+
+def MyTeamInterval(team, T, matches_done=None, S=None, for_position=4, tolerance=0.5, simulations=2_000_000,
+                   confidence=0.95, workers=1, seed=None, engine=None):
+    """MyTeam with a precision target instead of a fixed sample count.
+
+    Samples in batches of ADAPTIVE_BATCH_SIZE and stops once the Wilson interval is within
+    +/- tolerance percentage points (or simulations is reached). Returns
+    (probability, (low, high), samples_used, example_out, example_tab).
+    """
+    teams, points, _, fixtures = season_arrays(T, matches_done, S)
+    status = _clinch_status(team, teams, points, fixtures, for_position)
+    if status is not None:
+        probability = 100.0 if status == CLINCHED else 0.0
+        return (probability, (probability, probability), 0, None, None)
+
+    target_i = teams.index(team)
+
+    def precise_enough(counts, done):
+        low, high = wilson_interval(counts[target_i, :for_position].sum(), done, confidence)
+        return (high - low) * 50 <= tolerance
+
+    outlook = SimulateSeason(T, matches_done, S, simulations, workers=workers, seed=seed,
+                             chunk_size=ADAPTIVE_BATCH_SIZE, stop=precise_enough, engine=engine)
+    example_out, example_tab = outlook.example(team, for_position)
+    return (outlook.probability(team, for_position), outlook.interval(team, for_position, confidence),
+            outlook.samples, example_out, example_tab)
+
+
+def MyTeamRare(team, T, matches_done=None, S=None, for_position=4, simulations=100_000, tilt=0.75,
+               workers=1, seed=None, engine=None):
+    """MyTeam for rare events (e.g. top-1 for a bottom-table team) via importance sampling.
+
+    Returns (probability, standard_error, example_out, example_tab), both in %. Exact
+    schedules need no sampling and report a standard error of 0.
+    """
+    teams, points, _, fixtures = season_arrays(T, matches_done, S)
+    status = _clinch_status(team, teams, points, fixtures, for_position)
+    if status is not None:
+        return (100.0 if status == CLINCHED else 0.0, 0.0, None, None)
+
+    outlook = SimulateSeason(T, matches_done, S, simulations, workers=workers, seed=seed,
+                             target=team, tilt=tilt, engine=engine)
+    example_out, example_tab = outlook.example(team, for_position)
+    return (outlook.probability(team, for_position), outlook.standard_error(team, for_position),
+            example_out, example_tab)
+
+
+class SampleSet:
+    """Every sample of one Monte Carlo run, kept so what-if questions need no new run.
+
+    outcomes holds every sample's results bit-packed (outcomes.column(m)[s] is True when
+    S[m]'s first team won in sample s), probabilities[s, m] is the model's P(first team
+    wins) at that point of sample s, and positions[s, i] the 0-based finishing position
+    of teams[i]. probabilities is float16 (relative error below 0.05%): it is the largest
+    array, and float32 would double the set's memory. Without pins, what_if() reproduces
+    SimulateSeason() with the same seed and chunk size.
+
+    points, nrr and matches ((i, j, head-to-head) per remaining match) are the run's inputs
+    as _simulate_chunk() takes them; S names the same matches.
+    """
+
+    def __init__(self, teams, points, nrr, matches, outcomes, probabilities, positions, seed_seq, engine=None):
+        self.engine = engine or DEFAULT_ENGINE
+        self.teams = teams
+        self.points = points
+        self.nrr = nrr
+        self.matches = matches
+        self.S = [(teams[a], teams[b]) for a, b, _ in matches]
+        self.outcomes = outcomes
+        self.probabilities = probabilities
+        self.positions = positions
+        self._seed_seq = seed_seq
+        self._resimulated = {}  # (pins, samples) -> positions of the targeted re-simulation
+        self._pin_totals = None  # _pin_weights() over all samples, shared by every leverage() call
+
+    def _pins(self, pinned):
+        """{match index: winner} -> {match index: True if the first team wins}"""
+        forced = {}
+        for m_idx, winner in (pinned or {}).items():
+            team_a, team_b = self.S[m_idx]
+            if winner not in (team_a, team_b):
+                raise ValueError(f"{winner} does not play match {m_idx} ({team_a} vs {team_b})")
+            forced[m_idx] = winner == team_a
+        return forced
+
+    def what_if(self, team, for_position, pinned=None, min_samples=WHATIF_MIN_SAMPLES,
+                resimulations=WHATIF_RESIMULATIONS):
+        """Percentage chance that team finishes in the top for_position with pinned results.
+
+        pinned maps indices into S to the team that wins that match. Samples that already
+        agree with every pin are reweighted by 1 / P(pinned result) at each pinned match,
+        which turns "these results happened" into "these results were forced" (earlier
+        results no longer lean towards ones that make the pins likely). When fewer than
+        min_samples effective samples remain, resimulations fresh samples are drawn with
+        the pinned matches fixed and only the others simulated.
+        Returns (probability, effective_samples, reused) where reused is False after a
+        re-simulation.
+        """
+        forced = self._pins(pinned)
+        i = self.teams.index(team)
+        qualified = self.positions[:, i] < for_position
+        if not forced:
+            return float(qualified.mean() * 100), len(qualified), True
+
+        matched = np.ones(len(qualified), dtype=bool)
+        for m_idx, a_wins in forced.items():
+            matched &= self.outcomes.column(m_idx) == a_wins
+        rows = np.flatnonzero(matched)
+        weight = np.ones(len(rows))
+        for m_idx, a_wins in forced.items():
+            prob_a = self.probabilities[rows, m_idx]
+            weight /= prob_a if a_wins else 1 - prob_a
+        effective = weight.sum() ** 2 / (weight * weight).sum() if len(rows) else 0.0
+        if effective >= min_samples:
+            return float(np.dot(weight, qualified[rows]) / weight.sum() * 100), int(effective), True
+
+        key = (frozenset(forced.items()), resimulations)
+        if key not in self._resimulated:
+            self._resimulated[key] = self._resimulate(forced, resimulations)
+        positions = self._resimulated[key]
+        return float((positions[:, i] < for_position).mean() * 100), len(positions), False
+
+    def leverage(self, team, for_position):
+        """How much each remaining match matters to team, from the stored samples alone.
+
+        Returns [(m_idx, (team_a, team_b), p_if_a, p_if_b, swing)] in schedule order, where
+        p_if_a / p_if_b is the percentage chance of a top-for_position finish with that match
+        pinned to team_a / team_b (the same estimate what_if() gives for a single pin) and
+        swing = p_if_a - p_if_b. All matches come from one pass of conditional counts.
+        """
+        i = self.teams.index(team)
+        qualified = self.positions[:, i] < for_position
+        if self._pin_totals is None:
+            self._pin_totals = self._pin_weights(slice(None))
+        total_a, total_b = self._pin_totals
+        # Sum over whichever of qualified / not qualified has fewer rows
+        if qualified.mean() <= 0.5:
+            hit_a, hit_b = self._pin_weights(qualified)
+        else:
+            miss_a, miss_b = self._pin_weights(~qualified)
+            hit_a, hit_b = total_a - miss_a, total_b - miss_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            p_if_a = hit_a / total_a * 100
+            p_if_b = hit_b / total_b * 100
+        return [(m_idx, tuple(self.S[m_idx]), float(p_if_a[m_idx]), float(p_if_b[m_idx]),
+                 float(p_if_a[m_idx] - p_if_b[m_idx])) for m_idx in range(len(self.S))]
+
+    def _pin_weights(self, rows):
+        """Per match, the summed single-pin weights (1 / P(result)) of rows where team_a / team_b won"""
+        won_a = self.outcomes.rows(rows)
+        prob_a = self.probabilities[rows].astype(np.float64)
+        return (won_a / prob_a).sum(axis=0), (~won_a / (1 - prob_a)).sum(axis=0)
+
+    def _resimulate(self, forced, samples):
+        # Same pins give the same stream, so a toggled-back what-if repeats its answer
+        pins = [2 * m_idx + a_wins for m_idx, a_wins in sorted(forced.items())]
+        rng = np.random.default_rng(np.random.SeedSequence(self._seed_seq.entropy,
+                                                           spawn_key=(WHATIF_SPAWN_TAG, *pins)))
+        positions = _simulate_chunk(self.engine, self.points, self.nrr, self.matches, samples, rng,
+                                    forced=forced)[3]
+        return positions.astype(np.int8)
+
+
+def SimulateSamples(T, matches_done=None, S=None, simulations=100_000, seed=None, chunk_size=MC_CHUNK_SIZE,
+                    engine=None):
+    """Monte Carlo run like SimulateSeason() that keeps every sample in a SampleSet.
+
+    Chunks use the same per-chunk streams as SimulateSeason(), so the unpinned answers
+    match it for the same seed and chunk size.
+    """
+    engine = engine or DEFAULT_ENGINE
+    teams, points, nrr, fixtures = season_arrays(T, matches_done, S)
+    seed_seq = np.random.SeedSequence(seed)
+    matches = [(a, b, engine.head_to_head_modifier(teams[a], teams[b])) for a, b in fixtures]
+
+    outcomes = OutcomeBits(simulations, len(matches))
+    probabilities = np.empty((simulations, len(matches)), dtype=np.float16)
+    positions = np.empty((simulations, len(teams)), dtype=np.int8)
+    chunk_sizes = [min(chunk_size, simulations - start) for start in range(0, simulations, chunk_size)]
+    start = 0
+    for size, stream in zip(chunk_sizes, seed_seq.spawn(len(chunk_sizes))):
+        chunk = slice(start, start + size)
+        chunk_outcomes, _, _, chunk_positions, _, _ = _simulate_chunk(
+            engine, points, nrr, matches, size, np.random.default_rng(stream),
+            probabilities=probabilities[chunk])
+        outcomes[chunk] = chunk_outcomes
+        positions[chunk] = chunk_positions
+        start += size
+    return SampleSet(teams, points, nrr, matches, outcomes, probabilities, positions, seed_seq, engine)
+
+
+def MyTeamWhatIf(team, T, matches_done=None, S=None, for_position=4, pinned=None, simulations=100_000,
+                 seed=None, engine=None):
+    """MyTeam with some remaining results fixed: pinned maps indices into S to winners.
+
+    For repeated questions on one season build a SampleSet once with SimulateSamples()
+    and call its what_if(). Returns (probability, effective_samples, reused).
+    """
+    samples = SimulateSamples(T, matches_done, S, simulations, seed, engine=engine)
+    return samples.what_if(team, for_position, pinned)
+
+
+def MostLikelyScenarios(team, T, S=None, for_position=4, top_k=1, beam_width=SCENARIO_BEAM_WIDTH, engine=None):
+    """The top_k most probable sets of results for S in which team finishes top for_position.
+
+    Beam search over the schedule in order: every partial scenario is extended by both
+    results of the next match with the model's probability at that point, scenarios in
+    which team can no longer reach the top for_position on points are dropped, and the
+    beam_width likeliest survive. NRR moves by its mean swing, as in exact enumeration.
+    Returns [(scenario_probability, example_out, example_tab)], likeliest first; fewer
+    than top_k (possibly none) if the beam finds fewer qualifying scenarios.
+    """
+    engine = engine or DEFAULT_ENGINE
+    teams, points, nrr, fixtures = season_arrays(T, None, S)
+    t = teams.index(team)
+    num_teams = len(teams)
+
+    pt = points[None, :].copy()
+    nr = nrr[None, :].copy()
+    form = engine.form_buffer(1, num_teams)
+    log_prob = np.zeros(1)
+    outcomes = np.zeros((1, len(fixtures)), dtype=bool)
+    # Matches team still plays after each point of the schedule
+    own_left = np.cumsum([t in match for match in fixtures][::-1])[::-1].tolist() + [0]
+
+    for m_idx, (a, b) in enumerate(fixtures):
+        prob_a = engine.win_probability(pt, nr, form, a, b, engine.head_to_head_modifier(teams[a], teams[b]))
+
+        # Both results of this match for every scenario (row 2r: team_a wins, 2r + 1: team_b)
+        pt, nr, outcomes = (np.repeat(x, 2, axis=0) for x in (pt, nr, outcomes))
+        form.expand(2)
+        a_wins = np.tile([True, False], len(log_prob))
+        log_prob = np.repeat(log_prob, 2) + np.log(np.where(a_wins, np.repeat(prob_a, 2),
+                                                            1 - np.repeat(prob_a, 2)))
+        outcomes[:, m_idx] = a_wins
+        engine.apply_results(pt, nr, form, a, b, a_wins)
+
+        # Drop scenarios where for_position rivals already outscore team's best finish
+        best_points = pt[:, t] + 2 * own_left[m_idx + 1]
+        alive = (pt > best_points[:, None]).sum(axis=1) < for_position
+        keep = np.flatnonzero(alive)
+        if len(keep) > beam_width:
+            keep = keep[np.argpartition(-log_prob[keep], beam_width - 1)[:beam_width]]
+        pt, nr, outcomes, log_prob = pt[keep], nr[keep], outcomes[keep], log_prob[keep]
+        form.take(keep)
+
+    composite = pt * 1000 + nr
+    rankings = np.argsort(-composite, axis=1, kind='stable')
+    qualified = np.flatnonzero((rankings[:, :for_position] == t).any(axis=1))
+    best = qualified[np.argsort(-log_prob[qualified], kind='stable')[:top_k]]
+    S = [(teams[a], teams[b]) for a, b in fixtures]
+    return [(float(np.exp(log_prob[r])),) + _build_example([], S, outcomes[r], pt[r], nr[r], teams)
+            for r in best]
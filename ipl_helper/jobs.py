@@ -0,0 +1,96 @@
+# RCBinator
+# Background simulation jobs for the web API: submit returns at once, callers poll
+
+import os
+import time
+import threading
+import concurrent.futures
+from collections import OrderedDict
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# Jobs run side by side (at least two), so one large simulation cannot hold up everyone else's
+JOB_WORKERS = max(2, os.cpu_count() or 1)
+# Finished jobs remembered for polling (and for answering repeats) before eviction
+FINISHED_JOBS_KEPT = 256
+
+
+class JobQueue:
+    """Runs functions in a background thread pool under caller-chosen job ids.
+
+    Submitting an id that is already pending, running or done returns that job instead of
+    starting another, so identical requests share one simulation. A failed job is retried
+    on the next submit.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, keep=FINISHED_JOBS_KEPT):
+        self.keep = keep
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                               thread_name_prefix='rcbinator-job')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job id -> job dict, oldest first
+
+    def submit(self, job_id, func, *args, **kwargs):
+        """Start func(*args, **kwargs) as job_id unless an identical job exists; returns its status"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] != FAILED:
+                return self._public(job_id, job)
+            job = {'status': PENDING, 'submitted_at': time.time(), 'result': None, 'error': None}
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._evict()
+            job['future'] = self._executor.submit(self._run, job_id, job, func, args, kwargs)
+        return self.status(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """Block until job_id has finished (or timeout seconds pass); returns its status, None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        concurrent.futures.wait([job['future']], timeout=timeout)
+        with self._lock:
+            return self._public(job_id, job)
+
+    def status(self, job_id):
+        """{'job_id', 'status', 'result'/'error'} for a known job, None otherwise"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else self._public(job_id, job)
+
+    def _run(self, job_id, job, func, args, kwargs):
+        with self._lock:
+            job['status'] = RUNNING
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            with self._lock:
+                job['status'] = FAILED
+                job['error'] = f"{type(error).__name__}: {error}"
+            return
+        with self._lock:
+            job['result'] = result
+            job['status'] = DONE
+            job['seconds'] = time.time() - job['submitted_at']
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in (DONE, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _public(job_id, job):
+        status = {'job_id': job_id, 'status': job['status']}
+        if job['status'] == DONE:
+            status['result'] = job['result']
+            status['seconds'] = round(job['seconds'], 3)
+        elif job['status'] == FAILED:
+            status['error'] = job['error']
+        return status
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
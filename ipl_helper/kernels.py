@@ -0,0 +1,178 @@
+# RCBinator
+# Optional compiled Monte Carlo kernel: the per-sample tournament loop, JIT-compiled with Numba
+#
+# The NumPy backend plays one match for all samples at a time. The kernel below instead
+# plays every match of one sample before moving to the next, with no temporary arrays.
+# It draws from the same random streams in the same order, so every backend gives the
+# same samples for a seed.
+
+import os
+import numpy as np
+
+# Numba is optional: without it the NumPy backend is used
+try:
+    import numba
+    HAVE_NUMBA = True
+except ImportError:
+    numba = None
+    HAVE_NUMBA = False
+
+# numpy, numba or python (the kernel uncompiled: slow, for checking it); unset = best available
+KERNEL_ENV = 'RCBINATOR_KERNEL'
+BACKENDS = ('numpy', 'numba', 'python')
+# Matches whose random draws are made ahead of one kernel call (bounds the draw buffers)
+KERNEL_BLOCK = 16
+
+
+def default_backend():
+    """Backend named by RCBINATOR_KERNEL, else numba when importable, else numpy"""
+    return os.environ.get(KERNEL_ENV) or ('numba' if HAVE_NUMBA else 'numpy')
+
+
+def check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown kernel backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == 'numba' and not HAVE_NUMBA:
+        raise ValueError("kernel backend 'numba' needs numba installed (pip install numba)")
+    return backend
+
+
+def _play_block(pt, nr, results, forms, match_a, match_b, h2h, slot_a, slot_b, seen_a, seen_b,
+                forced, u_win, u_jitter, m_offset, weights, form_weight, nrr_changes, jitter_threshold,
+                target_i, tilt, log_weight, probabilities, words):
+    """Play matches m_offset.. of the block for every sample, one sample at a time.
+
+    Same arithmetic, in the same order and precision, as Engine.win_probability,
+    Engine.apply_results and RecentFormBuffer.record (form in float32).
+    """
+    samples = pt.shape[0]
+    points_weight, nrr_weight = weights[0], weights[1]
+    high, medium, low = nrr_changes[0], nrr_changes[1], nrr_changes[2]
+    record = probabilities.shape[0] > 0
+    for s in range(samples):
+        for k in range(match_a.shape[0]):
+            a = match_a[k]
+            b = match_b[k]
+            m_idx = m_offset + k
+
+            # Strength and head-to-head, clipped as in the NumPy path
+            strength_a = (points_weight * pt[s, a] / 28 + nrr_weight * (nr[s, a] + 1.5) / 3
+                          + form_weight * forms[s, a])
+            strength_b = (points_weight * pt[s, b] / 28 + nrr_weight * (nr[s, b] + 1.5) / 3
+                          + form_weight * forms[s, b])
+            strength_a = max(0.1, min(1.0, strength_a))
+            strength_b = max(0.1, min(1.0, strength_b))
+            prob_a = max(0.1, min(0.9, strength_a / (strength_a + strength_b) + h2h[k]))
+            if record:
+                probabilities[s, k] = prob_a
+
+            if forced[k] >= 0:
+                a_wins = forced[k] == 1
+            elif target_i < 0:
+                a_wins = u_win[k, s] < prob_a
+            else:
+                # Importance sampling: tilted proposal, likelihood ratio into log_weight
+                if a == target_i:
+                    direction = 1.0
+                elif b == target_i:
+                    direction = -1.0
+                else:
+                    direction = np.sign(pt[s, b] - pt[s, a])
+                logit = np.log(prob_a / (1 - prob_a)) + tilt * direction
+                proposal_a = 1 / (1 + np.exp(-logit))
+                a_wins = u_win[k, s] < proposal_a
+                if a_wins:
+                    log_weight[s] += np.log(prob_a / proposal_a)
+                else:
+                    log_weight[s] += np.log((1 - prob_a) / (1 - proposal_a))
+            if a_wins:
+                words[s, m_idx >> 6] |= np.uint64(1) << np.uint64(m_idx & 63)
+
+            # NRR swing from the points gap before the match, 10% larger nrr_jitter of the time
+            points_diff = abs(pt[s, a] - pt[s, b])
+            if points_diff >= 8:
+                nrr_change = high
+            elif points_diff >= 4:
+                nrr_change = medium
+            else:
+                nrr_change = low
+            if u_jitter[k, s] > jitter_threshold:
+                nrr_change = nrr_change * 1.1
+            if a_wins:
+                pt[s, a] += 2
+                nr[s, a] += nrr_change
+                nr[s, b] -= nrr_change
+            else:
+                pt[s, b] += 2
+                nr[s, a] -= nrr_change
+                nr[s, b] += nrr_change
+
+            # Recent form: ring buffer slot per team, share of wins in float32
+            results[s, a, slot_a[k]] = 1 if a_wins else 0
+            results[s, b, slot_b[k]] = 0 if a_wins else 1
+            wins = np.float32(0)
+            for j in range(seen_a[k]):
+                wins += np.float32(results[s, a, j])
+            form = np.float32(0.1) + np.float32(0.9) * wins / np.float32(seen_a[k])
+            forms[s, a] = max(np.float32(0.1), min(np.float32(1.0), form))
+            wins = np.float32(0)
+            for j in range(seen_b[k]):
+                wins += np.float32(results[s, b, j])
+            form = np.float32(0.1) + np.float32(0.9) * wins / np.float32(seen_b[k])
+            forms[s, b] = max(np.float32(0.1), min(np.float32(1.0), form))
+
+
+_compiled_block = numba.njit(cache=True)(_play_block) if HAVE_NUMBA else None
+
+
+def play_matches(engine, pt, nr, form, outcomes, matches, rng, target_i=None, tilt=0.0,
+                 forced=None, probabilities=None, log_weight=None):
+    """The match loop of _simulate_chunk on engine.backend's kernel (not numpy).
+
+    Updates pt, nr, form and outcomes in place like the NumPy loop, drawing the same
+    numbers from rng: per match, the result (unless forced) and then the NRR jitter.
+    """
+    block = _compiled_block if engine.backend == 'numba' else _play_block
+    samples = pt.shape[0]
+    weights = np.array([engine.points_weight, engine.nrr_weight])
+    nrr_changes = np.array([engine.nrr_changes['high'], engine.nrr_changes['medium'],
+                            engine.nrr_changes['low']])
+    no_probabilities = np.empty((0, 0))
+    no_weight = np.empty(0)
+    forced = forced or {}
+
+    for start in range(0, len(matches), KERNEL_BLOCK):
+        part = matches[start:start + KERNEL_BLOCK]
+        size = len(part)
+        match_a = np.array([a for a, _, _ in part], dtype=np.int64)
+        match_b = np.array([b for _, b, _ in part], dtype=np.int64)
+        h2h = np.array([h for _, _, h in part], dtype=np.float64)
+        pinned = np.array([int(forced[m]) if m in forced else -1 for m in range(start, start + size)],
+                          dtype=np.int8)
+        # Ring-buffer slot and results seen per match; every sample plays the same schedule
+        slots = np.empty((2, size), dtype=np.int64)
+        seen = np.empty((2, size), dtype=np.int64)
+        for k, (a, b, _) in enumerate(part):
+            for side, t in enumerate((a, b)):
+                slots[side, k] = form.played[t] % form.window
+                form.played[t] += 1
+                seen[side, k] = min(int(form.played[t]), form.window)
+
+        # The kernel records this block's probabilities in float64; the caller's array may be narrower
+        block_probabilities = no_probabilities if probabilities is None else np.empty((samples, size))
+
+        # Same draws, in the same order, as the NumPy loop
+        u_win = np.zeros((size, samples))
+        u_jitter = np.empty((size, samples))
+        for k in range(size):
+            if pinned[k] < 0:
+                rng.random(out=u_win[k])
+            rng.random(out=u_jitter[k])
+
+        block(pt, nr, form.results, form.forms, match_a, match_b, h2h, slots[0], slots[1],
+              seen[0], seen[1], pinned, u_win, u_jitter, start, weights, np.float32(engine.form_weight),
+              nrr_changes, 1 - engine.nrr_jitter, -1 if target_i is None else target_i, float(tilt),
+              no_weight if log_weight is None else log_weight,
+              block_probabilities, outcomes.words)
+        if probabilities is not None:
+            probabilities[:, start:start + size] = block_probabilities
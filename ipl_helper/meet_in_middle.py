@@ -0,0 +1,145 @@
+# RCBinator
+# Exact finishing positions for the form-free model by meet-in-the-middle
+#
+# In the form-free model every remaining match has a fixed win probability (the engine's
+# model on the current table with neutral form), teams finish by points and ties are
+# broken by the current NRR. The two halves of the schedule are then independent: each
+# half is enumerated into the distribution of its win-count vectors, identical vectors
+# are merged, and the halves are combined per team by counting, for every pair of
+# half-results, how many teams finish above it.
+
+import numpy as np
+
+from ipl_helper.ipl_helper import DEFAULT_ENGINE, SeasonOutlook, season_arrays
+
+# Beyond this many remaining matches the half distributions get too large to combine
+MITM_MATCH_LIMIT = 36
+# Pairs of half-results counted per block (bounds the block's working arrays)
+MITM_BLOCK_PAIRS = 4_000_000
+
+
+def static_probabilities(T, S=None, engine=None):
+    """P(first team wins) for every remaining match, from the current table with neutral form"""
+    return _static_probabilities(engine or DEFAULT_ENGINE, *season_arrays(T, None, S))
+
+
+def _static_probabilities(engine, teams, points, nrr, fixtures):
+    form = engine.form_buffer(1, len(teams))
+    return [float(engine.win_probability(points[None], nrr[None], form, a, b,
+                                         engine.head_to_head_modifier(teams[a], teams[b]))[0])
+            for a, b in fixtures]
+
+
+def _unique_rows(rows, weight):
+    """Distinct rows of a small non-negative int matrix, with their summed weights"""
+    radix = rows.max(axis=0).astype(np.int64) + 1
+    mult = np.concatenate([np.cumprod(radix[::-1])[::-1][1:], [1]])
+    keys, inverse = np.unique(rows.astype(np.int64) @ mult, return_inverse=True)
+    merged = np.bincount(inverse.ravel(), weights=weight, minlength=len(keys))
+    return (keys[:, None] // mult) % radix, merged
+
+
+def half_distribution(matches, probabilities, num_teams):
+    """(wins, weight): every distinct win-count vector of the given matches and its probability.
+
+    matches are (i, j) team-index pairs; identical vectors are merged after each match,
+    so the work grows with the number of distinct vectors, not with 2^len(matches).
+    """
+    games = np.zeros(num_teams, dtype=np.int64)
+    for i, j in matches:
+        games[i] += 1
+        games[j] += 1
+    mult = np.concatenate([np.cumprod((games + 1)[::-1])[::-1][1:], [1]])
+    keys = np.zeros(1, dtype=np.int64)
+    weight = np.ones(1)
+    for (i, j), p in zip(matches, probabilities):
+        keys = np.concatenate([keys + mult[i], keys + mult[j]])
+        weight = np.concatenate([weight * p, weight * (1 - p)])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        weight = np.bincount(inverse.ravel(), weights=weight, minlength=len(keys))
+    return (keys[:, None] // mult) % (games + 1), weight
+
+
+def _team_row(t, points, nrr, first, second):
+    """Exact finishing-position distribution of team t from the two half distributions"""
+    num_teams = len(points)
+    wins_1, weight_1 = first
+    wins_2, weight_2 = second
+    others = [j for j in range(num_teams) if j != t]
+
+    # j finishes above t iff (wins_j - wins_t) over both halves reaches need[j]
+    need = []
+    for j in others:
+        gap = points[t] - points[j]
+        above_on_tie = nrr[j] > nrr[t] or (nrr[j] == nrr[t] and j < t)
+        need.append(gap // 2 + 1 - (1 if gap % 2 == 0 and above_on_tie else 0))
+    lead_2 = wins_2[:, others] - wins_2[:, [t]]
+    needed_2 = np.array(need) - (wins_1[:, others] - wins_1[:, [t]])
+
+    # Needs outside the second half's range all behave alike; clip them together and merge
+    low, high = lead_2.min(axis=0), lead_2.max(axis=0)
+    needed_2 = np.clip(needed_2, low, high + 1)
+    # Teams always above (need <= any lead) or never above t can be counted once
+    always = np.all(needed_2 <= low, axis=0)
+    never = np.all(needed_2 > high, axis=0)
+    active = ~(always | never)
+    base_count = int(always.sum())
+    row = np.zeros(num_teams)
+    if not active.any():
+        row[base_count] = 1.0
+        return row
+
+    low, high = low[active], high[active]
+    needed_2, weight_1 = _unique_rows(needed_2[:, active] - low, weight_1)
+    needed_2 += low
+    lead_2 = np.clip(lead_2[:, active], needed_2.min(axis=0) - 1, needed_2.max(axis=0))
+    shift = lead_2.min(axis=0)
+    lead_2, weight_2 = _unique_rows(lead_2 - shift, weight_2)
+    lead_2 += shift
+
+    # count[a, b] = teams above t = one-hot(needed) @ thermometer(lead)^T, as one float32 GEMM
+    columns = []
+    for k in range(needed_2.shape[1]):
+        values = np.arange(needed_2[:, k].min(), needed_2[:, k].max() + 1)
+        columns.append((needed_2[:, [k]] == values, lead_2[:, [k]] >= values))
+    one_hot = np.hstack([c[0] for c in columns]).astype(np.float32)
+    thermometer = np.hstack([c[1] for c in columns]).astype(np.float32).T
+
+    block = max(1, MITM_BLOCK_PAIRS // len(lead_2))
+    tiled = np.tile(weight_2, block)
+    for start in range(0, len(needed_2), block):
+        count = (one_hot[start:start + block] @ thermometer).astype(np.int64)
+        rows = len(count)
+        count += np.arange(rows)[:, None] * num_teams + base_count
+        by_count = np.bincount(count.ravel(), weights=tiled[:count.size], minlength=rows * num_teams)
+        row += weight_1[start:start + block] @ by_count.reshape(rows, num_teams)
+    return row
+
+
+def ExactOutlook(T, matches_done=None, S=None, teams=None, engine=None):
+    """Exact SeasonOutlook of the form-free model for up to MITM_MATCH_LIMIT remaining matches.
+
+    Match probabilities are fixed from the current table (neutral form), positions go by
+    points with ties broken by the current NRR. teams limits the rows computed (others
+    stay zero). No example scenarios are attached. ValueError beyond MITM_MATCH_LIMIT.
+    """
+    names, points, nrr, matches = season_arrays(T, matches_done, S)
+    if len(matches) > MITM_MATCH_LIMIT:
+        raise ValueError(f"{len(matches)} remaining matches; the exact solver handles up to {MITM_MATCH_LIMIT}")
+    probabilities = _static_probabilities(engine or DEFAULT_ENGINE, names, points, nrr, matches)
+    index = {t: i for i, t in enumerate(names)}
+    points = [int(pts) for pts in points.tolist()]
+    nrr = nrr.tolist()
+
+    split = len(matches) // 2
+    first = half_distribution(matches[:split], probabilities[:split], len(names))
+    second = half_distribution(matches[split:], probabilities[split:], len(names))
+    matrix = np.zeros((len(names), len(names)))
+    for t in (teams or names):
+        matrix[index[t]] = _team_row(index[t], points, nrr, first, second)
+    return SeasonOutlook(names, matrix, {}, 1 << len(matches), True)
+
+
+def MyTeamExact(team, T, matches_done=None, S=None, for_position=4, engine=None):
+    """Exact percentage chance of a top-for_position finish in the form-free model"""
+    return ExactOutlook(T, matches_done, S, teams=[team], engine=engine).probability(team, for_position)
@@ -0,0 +1,185 @@
+# RCBinator
+# Background precomputation: simulate every team once per new season state and publish
+# the answers to a shared on-disk store that all front-end processes read
+#
+#   python -m ipl_helper.precompute              # poll Cricbuzz, precompute on every change
+#   python -m ipl_helper.precompute --once       # precompute the current state and exit
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+from ipl_helper.ipl_helper import SimulateSeason, MyTeamRare
+from ipl_helper.cricbuzz_scraper import fetch_season
+from ipl_helper.result_cache import result_key, season_key
+
+# Thresholds published for every team (top 1 / top 2 / top 3 / playoffs)
+THRESHOLDS = (1, 2, 3, 4)
+# The Streamlit app's default question; the worker answers it ahead of time
+DEFAULT_SIMULATIONS = 200_000
+DEFAULT_SEED = 2025
+# Seconds between checks for a new season state
+DEFAULT_INTERVAL = int(os.environ.get('RCBINATOR_PRECOMPUTE_INTERVAL', 60))
+# Season states kept on disk; older ones are pruned after each publish
+KEEP_STATES = 8
+DEFAULT_STORE_DIR = os.environ.get('RCBINATOR_STORE_DIR',
+                                   os.path.join(tempfile.gettempdir(), 'rcbinator-store'))
+
+
+class ResultStore:
+    """Precomputed results on disk, one JSON file per season state.
+
+    Each file maps result_key() to [probability, example_out, example_tab] and is
+    written then renamed, so readers in any process see either the whole season
+    state or nothing.
+    """
+
+    def __init__(self, directory=DEFAULT_STORE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._loaded = {}  # season key -> (mtime, entries)
+
+    def _path(self, state):
+        return os.path.join(self.directory, state + '.json')
+
+    def has(self, T, S):
+        """T, S as for season_key(): a points table and remaining fixtures, or a SeasonState and None"""
+        return os.path.exists(self._path(season_key(T, S)))
+
+    def get(self, T, S, key):
+        """(probability, example_out, example_tab) for result_key key, or None"""
+        entries = self._entries(season_key(T, S))
+        if entries is None or key not in entries:
+            return None
+        prob, out, tab = entries[key]
+        if out is not None:
+            out = [((team_a, team_b), winner) for (team_a, team_b), winner in out]
+        return prob, out, tab
+
+    def _entries(self, state):
+        path = self._path(state)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._loaded.get(state)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        try:
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)['results']
+        except (OSError, ValueError, KeyError):
+            return None
+        with self._lock:
+            self._loaded[state] = (mtime, entries)
+        return entries
+
+    def publish(self, T, S, entries):
+        """Atomically replace the results stored for season state (T, S)"""
+        data = {'published_at': time.time(), 'results': entries}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self._path(season_key(T, S)))
+        self._prune()
+
+    def _prune(self):
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith('.json')]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[KEEP_STATES:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def precompute(season, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED, workers=1):
+    """result_key -> [probability, example_out, example_tab] for every team and threshold.
+
+    One SimulateSeason() pass covers all teams; rare top-1 finishes are re-estimated with
+    importance sampling, exactly as the Streamlit app does on a miss.
+    """
+    outlook = SimulateSeason(season, simulations=simulations, workers=workers, seed=seed)
+    entries = {}
+    for team in outlook.teams:
+        for fp in THRESHOLDS:
+            prob = outlook.probability(team, fp)
+            out, tab = outlook.example(team, fp)
+            if fp == 1 and not outlook.exact and prob < 1.0:
+                prob, _, out, tab = MyTeamRare(team, season, for_position=1, simulations=simulations,
+                                               workers=workers, seed=seed)
+            entries[result_key(season, None, team, fp, simulations, seed)] = [prob, out, tab]
+    return entries
+
+
+class PrecomputeWorker(threading.Thread):
+    """Polls the season state and precomputes each new one into a ResultStore.
+
+    A state already in the store (published by this or another worker) is skipped.
+    stop() ends the loop after the current check.
+    """
+
+    def __init__(self, store=None, interval=DEFAULT_INTERVAL, simulations=DEFAULT_SIMULATIONS,
+                 seed=DEFAULT_SEED, workers=1, log=None):
+        super().__init__(daemon=True)
+        self.store = store or ResultStore()
+        self.interval = interval
+        self.simulations = simulations
+        self.seed = seed
+        self.workers = workers
+        self.log = log or (lambda message: None)
+        self.published = 0
+        self._stop_event = threading.Event()
+
+    def check(self):
+        """Precompute the current season state if it is new; True when something was published"""
+        season = fetch_season()
+        if self.store.has(season, None):
+            return False
+        start = time.perf_counter()
+        entries = precompute(season, self.simulations, self.seed, self.workers)
+        self.store.publish(season, None, entries)
+        self.published += 1
+        self.log(f"published {len(entries)} results for {season.matches_done} matches played "
+                 f"in {time.perf_counter() - start:.1f}s")
+        return True
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.check()
+            except Exception as error:  # Keep polling through scraper and network failures
+                self.log(f"precompute failed: {error!r}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m ipl_helper.precompute')
+    parser.add_argument('--once', action='store_true', help='precompute the current state and exit')
+    parser.add_argument('--interval', type=int, default=DEFAULT_INTERVAL)
+    parser.add_argument('--simulations', type=int, default=DEFAULT_SIMULATIONS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    worker = PrecomputeWorker(interval=args.interval, simulations=args.simulations,
+                              seed=args.seed, workers=args.workers, log=print)
+    if args.once:
+        worker.check()
+        return 0
+    worker.run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,105 @@
+# RCBinator
+# In-memory memo of simulation results, keyed by a hash of the season state
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from ipl_helper.ipl_helper import EXACT_MATCH_LIMIT
+from ipl_helper.season_state import SeasonState, season_digest
+
+# Results kept before the least recently used one is evicted (10 teams x 3 thresholds
+# is 30 entries per season state and sample count)
+DEFAULT_MAX_ENTRIES = 600
+
+
+def _digest(state):
+    return hashlib.sha256(json.dumps(state, separators=(',', ':')).encode()).hexdigest()
+
+
+def season_key(T, S):
+    """Stable hash of a season state (points table and remaining schedule).
+
+    T may be a SeasonState instead of the {team: [points, nrr]} dict (S is then unused);
+    the state hashes itself once and both forms give the same key.
+    """
+    if isinstance(T, SeasonState):
+        return T.season_key
+    return season_digest([(t, pts, nrr) for t, (pts, nrr) in T.items()], S)
+
+
+def result_key(T, S, team, for_position, simulations, seed):
+    """Stable hash of everything a probability depends on.
+
+    T is {team: [points, nrr]} and S the remaining [team_a, team_b] fixtures, as
+    MyTeam() takes them, or T is a SeasonState and S unused. Equal inputs give equal
+    keys in every process. Schedules short enough to be enumerated exactly ignore the
+    sample count.
+    """
+    remaining = len(T.remaining_fixtures()) if isinstance(T, SeasonState) else len(S)
+    if remaining <= EXACT_MATCH_LIMIT:
+        simulations = 0
+    state = {
+        'season': season_key(T, S),
+        'team': team,
+        'for_position': for_position,
+        'simulations': int(simulations),
+        'seed': seed,
+    }
+    return _digest(state)
+
+
+class ResultCache:
+    """Thread-safe LRU of (probability, example_out, example_tab) results.
+
+    One instance is meant to be shared by every session of a server process, so the
+    same question asked twice is answered from memory. At most max_entries results are
+    kept; the least recently used is evicted first.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def put_outlook(self, outlook, T, S, simulations, seed, positions=(1, 2, 4)):
+        """Store every team's result at each threshold from one SimulateSeason() pass"""
+        for team in outlook.teams:
+            for fp in positions:
+                out, tab = outlook.example(team, fp)
+                self.put(result_key(T, S, team, fp, simulations, seed),
+                         (outlook.probability(team, fp), out, tab))
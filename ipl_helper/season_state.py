@@ -0,0 +1,150 @@
+# RCBinator
+# Compact, immutable season state: team indices and small NumPy arrays instead of dicts of lists
+
+import json
+import hashlib
+import numpy as np
+
+# Cricbuzz publishes NRR to three decimals; rounding the float32 back recovers it exactly
+NRR_DECIMALS = 3
+# Winner of a completed match the result page did not name (e.g. a washout)
+NO_RESULT = -1
+
+
+def season_digest(table, schedule):
+    """sha256 of a points table [(team, points, nrr)] and the remaining [(team_a, team_b)] fixtures"""
+    state = {
+        'table': [[t, int(pts), float(nrr)] for t, pts, nrr in table],
+        'schedule': [list(match) for match in schedule],
+    }
+    return hashlib.sha256(json.dumps(state, separators=(',', ':')).encode()).hexdigest()
+
+
+def _frozen(values, dtype, shape=None):
+    array = np.array(values, dtype=dtype)
+    if shape is not None:
+        array = array.reshape(shape)
+    array.flags.writeable = False
+    return array
+
+
+class SeasonState:
+    """Immutable season state from one data refresh.
+
+    teams holds the names in points-table order; everything else refers to a team by its
+    index there. points (int16) and nrr (float32) are per team, fixtures an int8
+    (matches, 2) matrix of the full schedule in order, matches_done the completed count
+    and winners the int8 winner of each completed match (NO_RESULT when the result page
+    did not name one; empty when results were not scraped).
+
+    The arrays are read-only, so one state can be shared by any number of threads and
+    handed to workers without copying. Equal states hash equal; season_key is the
+    result-cache key of the points table and remaining schedule, computed once.
+    """
+    __slots__ = ('teams', 'points', 'nrr', 'fixtures', 'matches_done', 'winners', '_hash', '_season_key')
+
+    def __init__(self, teams, points, nrr, fixtures, matches_done, winners=()):
+        teams = tuple(teams)
+        fixtures = _frozen(fixtures, np.int8, (-1, 2))
+        winners = _frozen(winners, np.int8)
+        if len(points) != len(teams) or len(nrr) != len(teams):
+            raise ValueError(f"{len(teams)} teams but {len(points)} points and {len(nrr)} NRR values")
+        if fixtures.size and (fixtures.min() < 0 or fixtures.max() >= len(teams)):
+            raise ValueError("fixture refers to a team index outside the table")
+        if not 0 <= matches_done <= len(fixtures):
+            raise ValueError(f"matches_done={matches_done} with {len(fixtures)} fixtures")
+        if winners.size and (winners.min() < NO_RESULT or winners.max() >= len(teams)):
+            raise ValueError("winner refers to a team index outside the table")
+
+        set_slot = object.__setattr__
+        set_slot(self, 'teams', teams)
+        set_slot(self, 'points', _frozen(points, np.int16))
+        set_slot(self, 'nrr', _frozen(nrr, np.float32))
+        set_slot(self, 'fixtures', fixtures)
+        set_slot(self, 'matches_done', int(matches_done))
+        set_slot(self, 'winners', winners)
+        set_slot(self, '_hash', None)
+        set_slot(self, '_season_key', None)
+
+    @classmethod
+    def from_rows(cls, table, schedule, matches_done, results=()):
+        """State from (team, points, nrr) rows, (team_a, team_b) fixtures and winner names.
+
+        ValueError if a fixture or result names a team missing from the table.
+        """
+        teams = [team for team, _, _ in table]
+        index = {team: i for i, team in enumerate(teams)}
+        try:
+            fixtures = [(index[team_a], index[team_b]) for team_a, team_b in schedule]
+            winners = [NO_RESULT if winner is None else index[winner] for winner in results]
+        except KeyError as error:
+            raise ValueError(f"team {error.args[0]!r} is not in the points table") from None
+        return cls(teams, [pts for _, pts, _ in table], [nrr for _, _, nrr in table],
+                   fixtures, matches_done, winners)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (type(self), (self.teams, self.points, self.nrr, self.fixtures, self.matches_done, self.winners))
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash((self.teams, self.matches_done, self.points.tobytes(),
+                                                    self.nrr.tobytes(), self.fixtures.tobytes(),
+                                                    self.winners.tobytes())))
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, SeasonState):
+            return NotImplemented
+        return (self.teams == other.teams and self.matches_done == other.matches_done
+                and np.array_equal(self.points, other.points) and np.array_equal(self.nrr, other.nrr)
+                and np.array_equal(self.fixtures, other.fixtures)
+                and np.array_equal(self.winners, other.winners))
+
+    def __repr__(self):
+        return (f"SeasonState({len(self.teams)} teams, {self.matches_done} of "
+                f"{len(self.fixtures)} matches played)")
+
+    @property
+    def season_key(self):
+        """result_cache.season_key() of this state, hashed on first use"""
+        if self._season_key is None:
+            object.__setattr__(self, '_season_key', season_digest(self.table, self.schedule[self.matches_done:]))
+        return self._season_key
+
+    @property
+    def table(self):
+        """(team, points, nrr) rows in points-table order"""
+        return tuple((team, int(pts), round(float(nrr), NRR_DECIMALS))
+                     for team, pts, nrr in zip(self.teams, self.points, self.nrr))
+
+    @property
+    def schedule(self):
+        """Full ordered tuple of (team_a, team_b) fixtures"""
+        return tuple((self.teams[a], self.teams[b]) for a, b in self.fixtures.tolist())
+
+    @property
+    def results(self):
+        """Winner's name for each completed match (None when not named)"""
+        return tuple(None if w == NO_RESULT else self.teams[w] for w in self.winners.tolist())
+
+    def nrr_values(self):
+        """float64 NRR per team as published (each float32 rounded back to NRR_DECIMALS)"""
+        return np.array([round(float(nrr), NRR_DECIMALS) for nrr in self.nrr.tolist()])
+
+    def remaining_fixtures(self):
+        """Read-only (remaining matches, 2) view of the fixture matrix"""
+        return self.fixtures[self.matches_done:]
+
+    def points_table(self):
+        """Fresh {team: [points, nrr]} dict, safe for the caller to mutate"""
+        return {team: [pts, nrr] for team, pts, nrr in self.table}
+
+    def full_schedule(self):
+        """Fresh list of [team_a, team_b] fixtures, as get_ipl_schedule() returns"""
+        return [[self.teams[a], self.teams[b]] for a, b in self.fixtures.tolist()]
+
+    def remaining_schedule(self):
+        return self.full_schedule()[self.matches_done:]
@@ -0,0 +1,77 @@
+# RCBinator
+# Offline season snapshots: record one season state to disk and replay it without Cricbuzz
+#
+#   python -m ipl_helper.snapshot record season.json   # scrape once and save
+#   RCBINATOR_SNAPSHOT=season.json streamlit run app.py  # replay, no network
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+from ipl_helper.season_state import SeasonState
+
+# Bump when the file layout changes; load_snapshot() refuses versions it does not know
+SNAPSHOT_VERSION = 1
+# Replay this snapshot instead of scraping Cricbuzz (unset = live data)
+REPLAY_ENV = 'RCBINATOR_SNAPSHOT'
+
+_replay_path = os.environ.get(REPLAY_ENV) or None
+
+
+def replay(path):
+    """Serve fetch_season() from the snapshot at path from now on (None = live data again)"""
+    global _replay_path
+    _replay_path = path
+
+
+def replay_path():
+    return _replay_path
+
+
+def save_snapshot(season, path):
+    """Write season as a versioned JSON snapshot (atomically, so replays never see half a file)"""
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'saved_at': time.time(),
+        'table': [list(row) for row in season.table],
+        'schedule': [list(match) for match in season.schedule],
+        'matches_done': season.matches_done,
+        'results': list(season.results),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """SeasonState saved by save_snapshot(); ValueError for an unknown format version"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: snapshot version {data.get('version')!r}, "
+                         f"expected {SNAPSHOT_VERSION}")
+    return SeasonState.from_rows(
+        table=[(team, int(pts), float(nrr)) for team, pts, nrr in data['table']],
+        schedule=data['schedule'],
+        matches_done=int(data['matches_done']),
+        results=data.get('results', ()),
+    )
+
+
+def main(argv):
+    if len(argv) != 2 or argv[0] != 'record':
+        print("usage: python -m ipl_helper.snapshot record PATH", file=sys.stderr)
+        return 2
+    from ipl_helper.cricbuzz_scraper import get_client
+    season = get_client().fetch_season()
+    save_snapshot(season, argv[1])
+    print(f"saved {argv[1]}: {season.matches_done} of {len(season.schedule)} matches played")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
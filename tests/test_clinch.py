@@ -0,0 +1,64 @@
+# RCBinator
+# The points-only clinch / elimination solver must agree with brute-force enumeration
+
+import random
+import numpy as np
+import pytest
+
+from ipl_helper.clinch import CLINCHED, ELIMINATED, clinch_status
+
+TEAMS = ["CSK", "DC", "GT", "MI", "PBSK", "RR"]
+
+
+def brute_force_status(team, T, S, for_position):
+    """clinch_status() by playing out every outcome of S on points alone"""
+    names = list(T)
+    index = {t: i for i, t in enumerate(names)}
+    a_wins = (np.arange(1 << len(S))[:, None] >> np.arange(len(S))) & 1
+    points = np.tile([T[t][0] for t in names], (1 << len(S), 1))
+    for m_idx, (a, b) in enumerate(S):
+        points[:, index[a]] += 2 * a_wins[:, m_idx]
+        points[:, index[b]] += 2 * (1 - a_wins[:, m_idx])
+    own = points[:, [index[team]]]
+    rivals = np.delete(points, index[team], axis=1)
+    # Clinched: in the top for_position even losing every tie; eliminated: out even winning them
+    if np.all((rivals >= own).sum(axis=1) < for_position):
+        return CLINCHED
+    if np.all((rivals > own).sum(axis=1) >= for_position):
+        return ELIMINATED
+    return None
+
+
+def random_case(rng):
+    num_teams = rng.randint(3, len(TEAMS))
+    teams = TEAMS[:num_teams]
+    # Narrow points spread so ties at the cutoff are common
+    T = {t: (rng.randrange(0, 12, 2),) for t in teams}
+    S = [tuple(rng.sample(teams, 2)) for _ in range(rng.randint(0, 10))]
+    return rng.choice(teams), T, S, rng.randint(1, num_teams)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_clinch_status_matches_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        team, T, S, for_position = random_case(rng)
+        assert clinch_status(team, T, S, for_position) == brute_force_status(team, T, S, for_position), \
+            (team, T, S, for_position)
+
+
+@pytest.mark.parametrize('team, T, S, for_position, expected', [
+    # Level with the 4th-placed team whatever happens: a tie on NRR can still go either way
+    ('RCB', {'RCB': (16,), 'CSK': (20,), 'MI': (18,), 'GT': (18,), 'DC': (14,)}, [('DC', 'GT')], 4, None),
+    # DC can at best draw level with RCB, and RCB would still have to win that tie
+    ('RCB', {'RCB': (16,), 'CSK': (20,), 'MI': (18,), 'GT': (18,), 'DC': (14,)}, [('DC', 'CSK')], 4, None),
+    # Nobody left can reach RCB's points
+    ('RCB', {'RCB': (16,), 'CSK': (20,), 'MI': (18,), 'GT': (18,), 'DC': (12,)}, [('DC', 'CSK')], 4, CLINCHED),
+    # RCB's best is a tie with the 4th-placed team on points
+    ('RCB', {'RCB': (12,), 'CSK': (20,), 'MI': (18,), 'GT': (18,), 'DC': (14,)}, [('RCB', 'CSK')], 4, None),
+    # RCB's best still leaves four teams strictly above
+    ('RCB', {'RCB': (10,), 'CSK': (20,), 'MI': (18,), 'GT': (18,), 'DC': (14,)}, [('RCB', 'CSK')], 4, ELIMINATED),
+])
+def test_ties_at_the_cutoff(team, T, S, for_position, expected):
+    assert clinch_status(team, T, S, for_position) == expected
+    assert brute_force_status(team, T, S, for_position) == expected
@@ -0,0 +1,77 @@
+# RCBinator
+# Every Monte Carlo backend must give the NumPy loop's samples for a seed
+
+import os
+import numpy as np
+import pytest
+
+from ipl_helper import Engine, SimulateSeason, SimulateSamples
+from ipl_helper.kernels import HAVE_NUMBA
+from ipl_helper.snapshot import load_snapshot
+
+FIXTURE_SNAPSHOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'benchmarks', 'fixtures', 'season.json')
+SEED = 11
+# The uncompiled kernel is slow; keep the sample count small enough for every backend
+SAMPLES = 3_000
+CHUNK = 1_000
+
+BACKENDS = [
+    'numpy',
+    pytest.param('numba', marks=pytest.mark.skipif(not HAVE_NUMBA, reason='numba is not installed')),
+    'python',
+]
+
+
+@pytest.fixture(scope='module')
+def season():
+    return load_snapshot(FIXTURE_SNAPSHOT)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return Engine(backend='numpy')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_plain_run_matches_numpy(backend, season, reference):
+    a = SimulateSeason(season, simulations=SAMPLES, seed=SEED, chunk_size=CHUNK, engine=reference)
+    b = SimulateSeason(season, simulations=SAMPLES, seed=SEED, chunk_size=CHUNK, engine=Engine(backend=backend))
+    assert np.array_equal(a.matrix, b.matrix)
+    assert a._examples == b._examples
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_tilted_run_matches_numpy(backend, season, reference):
+    # Same draws; log/exp may differ in the last bit between backends
+    a = SimulateSeason(season, simulations=SAMPLES, seed=SEED, chunk_size=CHUNK, target='MI', tilt=0.75,
+                       engine=reference)
+    b = SimulateSeason(season, simulations=SAMPLES, seed=SEED, chunk_size=CHUNK, target='MI', tilt=0.75,
+                       engine=Engine(backend=backend))
+    assert np.allclose(a.matrix, b.matrix, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_stored_samples_match_numpy(backend, season, reference):
+    S = season.remaining_schedule()
+    a = SimulateSamples(season, simulations=SAMPLES, seed=SEED, engine=reference)
+    b = SimulateSamples(season, simulations=SAMPLES, seed=SEED, engine=Engine(backend=backend))
+    assert np.array_equal(a.outcomes.words, b.outcomes.words)
+    assert np.array_equal(a.probabilities, b.probabilities)
+    assert np.array_equal(a.positions, b.positions)
+
+    # Forced re-simulation of the unpinned matches
+    pins = {0: S[0][1], 5: S[5][0]}
+    assert a.what_if('RCB', 4, pins, min_samples=np.inf, resimulations=SAMPLES // 2) == \
+        b.what_if('RCB', 4, pins, min_samples=np.inf, resimulations=SAMPLES // 2)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_monte_carlo_near_exact(backend, season):
+    # nrr_jitter=0: exact enumeration and Monte Carlo then run the same model
+    engine = Engine(backend=backend, nrr_jitter=0.0)
+    T, done, S = season.points_table(), season.matches_done, season.remaining_schedule()[-12:]
+    exact = SimulateSeason(T, done, S, exact=True, engine=engine)
+    sampled = SimulateSeason(T, done, S, SAMPLES, seed=SEED, exact=False, engine=engine)
+    error = np.sqrt(exact.matrix * (1 - exact.matrix) / SAMPLES)
+    assert np.all(np.abs(sampled.matrix - exact.matrix) <= 5 * error + 1e-12)